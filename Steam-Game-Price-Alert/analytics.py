@@ -0,0 +1,77 @@
+import time
+import price_history
+
+# Define constants
+WINDOW_DAYS = 30  # "Recent low" window
+NEAR_LOW_RATIO = 0.05  # "At a low" means within 5% of the all-time low
+
+def load_arrays(history=None):
+    """
+    Return the whole price history as NumPy columns (timestamp, app_id,
+    final_cents, discount_percent) without copying the file. Rows are in
+    append order, which is also time order.
+    """
+    import numpy as np  # Only needed for analytics, keeps NumPy out of the scan path
+
+    history = history or price_history.get_history()
+    records = np.frombuffer(history.records_buffer(), dtype="<u4").reshape(-1, 4)
+    return records[:, 0], records[:, 1], records[:, 2] >> 8, records[:, 2] & 0xFF
+
+def summarize(app_ids=None, window_days=WINDOW_DAYS, near_low_ratio=NEAR_LOW_RATIO, now=None, history=None):
+    """
+    Compute price statistics for many apps in one vectorized pass. Returns
+    {app_id: stats} for every app with history, where stats holds samples,
+    current and current_discount, all_time_low, window_low (the lowest price
+    in the last window_days, counting the price the window opened at),
+    median (of recorded samples) and near_low. Prices are in cents.
+    """
+    import numpy as np
+
+    now = time.time() if now is None else now
+    timestamps, apps, finals, discounts = load_arrays(history)
+    if app_ids is not None:
+        keep = np.isin(apps, np.fromiter((int(app_id) for app_id in app_ids), dtype=np.uint32))
+        timestamps, apps, finals, discounts = (column[keep] for column in (timestamps, apps, finals, discounts))
+    if not len(apps):
+        return {}
+
+    # A stable sort by app keeps every app's samples in time order
+    order = np.argsort(apps, kind="stable")
+    apps, timestamps, finals, discounts = (column[order] for column in (apps, timestamps, finals, discounts))
+    starts = np.flatnonzero(np.r_[True, apps[1:] != apps[:-1]])
+    counts = np.diff(np.r_[starts, len(apps)])
+    newest = starts + counts - 1
+
+    current = finals[newest]
+    current_discount = discounts[newest]
+    all_time_low = np.minimum.reduceat(finals, starts)
+
+    cutoff = now - window_days * 86400
+    in_window = timestamps >= cutoff
+    window_low = np.minimum.reduceat(np.where(in_window, finals, np.iinfo(np.uint32).max), starts)
+    # The price in effect when the window opened is the newest sample before it
+    before = np.add.reduceat(~in_window, starts)
+    has_opening = before > 0
+    opening = finals[starts[has_opening] + before[has_opening] - 1]
+    window_low[has_opening] = np.minimum(window_low[has_opening], opening)
+
+    # Sorting (app, price) keys puts each app's prices in order at the same group offsets
+    by_price = (np.sort((apps.astype(np.uint64) << 32) | finals) & 0xFFFFFFFF).astype(np.float64)
+    median = (by_price[starts + (counts - 1) // 2] + by_price[starts + counts // 2]) / 2
+
+    near_low = current <= all_time_low * (1 + near_low_ratio)
+
+    return {
+        int(app_id): {
+            "samples": int(samples),
+            "current": int(price),
+            "current_discount": int(discount),
+            "all_time_low": int(low),
+            "window_low": int(recent_low),
+            "median": float(middle),
+            "near_low": bool(at_low)
+        }
+        for app_id, samples, price, discount, low, recent_low, middle, at_low in zip(
+            apps[starts], counts, current, current_discount, all_time_low, window_low, median, near_low
+        )
+    }
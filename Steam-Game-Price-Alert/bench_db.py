@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import db
+
+# Define constants
+GAME_COUNT = 500
+READ_OPS = 20000
+WRITE_OPS = 2000
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        game_name TEXT NOT NULL,
+        game_link TEXT NOT NULL,
+        price_threshold REAL
+    )
+'''
+
+def seed(path):
+    """Create the games table and fill it with synthetic rows."""
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.executemany(
+        "INSERT INTO games (game_name, game_link) VALUES (?, ?)",
+        [(f"Game {i}", f"https://store.steampowered.com/app/{i}/") for i in range(1, GAME_COUNT + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+def read_per_call(path):
+    """Baseline: open, query and close a connection for every lookup."""
+    for i in range(READ_OPS):
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT price_threshold FROM games WHERE id = ?", (i % GAME_COUNT + 1,))
+        cursor.fetchone()
+        conn.close()
+
+def read_managed(path):
+    """Lookups through the long-lived per-thread connection."""
+    for i in range(READ_OPS):
+        db.fetchone("SELECT price_threshold FROM games WHERE id = ?", (i % GAME_COUNT + 1,), path=path)
+
+def write_per_call(path):
+    """Baseline: open, update, commit and close for every write."""
+    for i in range(WRITE_OPS):
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE games SET price_threshold = ? WHERE id = ?", (i / 100, i % GAME_COUNT + 1))
+        conn.commit()
+        conn.close()
+
+def write_managed(path):
+    """Writes through the long-lived connection, one autocommit per statement."""
+    for i in range(WRITE_OPS):
+        db.execute("UPDATE games SET price_threshold = ? WHERE id = ?", (i / 100, i % GAME_COUNT + 1), path=path)
+
+def write_batched(path):
+    """Writes grouped into a single explicit transaction."""
+    with db.transaction(path) as conn:
+        for i in range(WRITE_OPS):
+            conn.execute("UPDATE games SET price_threshold = ? WHERE id = ?", (i / 100, i % GAME_COUNT + 1))
+
+def run(name, func, path, ops):
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28}{ops / elapsed:>12,.0f} ops/sec")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_games.db")
+        seed(path)
+        print(f"SQLite {sqlite3.sqlite_version}, Python {sys.version.split()[0]}, {GAME_COUNT} games\n")
+        run("read, open/close per call", read_per_call, path, READ_OPS)
+        run("read, managed connection", read_managed, path, READ_OPS)
+        run("write, open/close per call", write_per_call, path, WRITE_OPS)
+        run("write, managed autocommit", write_managed, path, WRITE_OPS)
+        run("write, batched transaction", write_batched, path, WRITE_OPS)
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
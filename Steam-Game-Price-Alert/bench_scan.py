@@ -0,0 +1,201 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Define constants
+GAME_COUNTS = (10, 1000, 10000)
+CYCLES = 2  # First cycle notifies every sale, later ones find them already notified
+STEAM_LATENCY = 0.02  # Seconds the stand-in Steam API takes per request
+DISCORD_LATENCY = 0.01
+DISCOUNT_RATE = 0.05
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def percentile(values, percent):
+    """Nearest-rank percentile of values, 0 when there are none."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))]
+
+class DbOpCounter:
+    """
+    Count SQL statements run on every thread's connection. db keeps one
+    connection per thread, so each connection db hands out is traced.
+    """
+
+    def __init__(self, db):
+        self.count = 0
+        self._db = db
+        self._get_connection = db.get_connection
+        self._traced = set()
+        self._lock = threading.Lock()
+        db.get_connection = self._connection
+
+    def _connection(self, *args, **kwargs):
+        conn = self._get_connection(*args, **kwargs)
+        if conn not in self._traced:
+            with self._lock:
+                self._traced.add(conn)
+            conn.set_trace_callback(self._trace)
+        return conn
+
+    def _trace(self, statement):
+        with self._lock:
+            self.count += 1
+
+    def close(self):
+        self._db.get_connection = self._get_connection
+        with self._lock:
+            for conn in self._traced:
+                try:
+                    conn.set_trace_callback(None)
+                except Exception:
+                    pass  # Closed along with its thread's state
+            self._traced.clear()
+
+def seed_watchlist(game_count):
+    """Replace the watchlist and notification state with game_count synthetic games."""
+    import db
+    from notification_state import get_state
+    from saved_games import add_games
+
+    state = get_state()  # Creates the notification_state table on first use
+    db.execute("DELETE FROM games")
+    db.execute("DELETE FROM notification_state")
+    state.reload()
+    add_games([
+        (f"Synthetic Game {i}", f"https://store.steampowered.com/app/{i}/", i,
+         f"https://cdn.akamai.steamstatic.com/steam/apps/{i}/header.jpg")
+        for i in range(1, game_count + 1)
+    ])
+
+def run_cycles(game_count, cycles, discord_stand_in):
+    """Seed game_count games, run the scan cycles and return one stats dict per cycle."""
+    import db
+    import scanner
+    from discord import get_dispatcher
+    from saved_games import get_watchlist
+
+    seed_watchlist(game_count)
+    fetch_latencies = []
+    fetch_price_batch = scanner.fetch_price_batch
+
+    def timed_fetch_price_batch(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fetch_price_batch(*args, **kwargs)
+        finally:
+            fetch_latencies.append(time.perf_counter() - start)
+
+    scanner.fetch_price_batch = timed_fetch_price_batch
+    counter = DbOpCounter(db)
+    dispatcher = get_dispatcher()
+    stats = []
+    try:
+        for cycle in range(1, cycles + 1):
+            fetch_latencies.clear()
+            dispatcher.latencies.clear()
+            counter.count = 0
+            start = time.perf_counter()
+            results, _ = scanner.run_scan_cycle(
+                get_watchlist(), scanner.MODE_SALE, "US", "en",
+                discord_stand_in.webhook_url, "Bench", ""
+            )
+            elapsed = time.perf_counter() - start
+            db_ops = counter.count
+            dispatcher.flush()
+            notify_latencies = list(dispatcher.latencies)
+            stats.append({
+                "games": game_count,
+                "cycle": cycle,
+                "elapsed": elapsed,
+                "games_per_sec": game_count / elapsed if elapsed else 0.0,
+                "fetch_p50": percentile(fetch_latencies, 50),
+                "fetch_p99": percentile(fetch_latencies, 99),
+                "requests": len(fetch_latencies),
+                "db_ops": db_ops,
+                "notified": sum(result["status"] == "notified" for result in results),
+                "unavailable": sum(result["status"] == "unavailable" for result in results),
+                "notify_p50": percentile(notify_latencies, 50),
+                "notify_p99": percentile(notify_latencies, 99)
+            })
+    finally:
+        scanner.fetch_price_batch = fetch_price_batch
+        counter.close()
+    return stats
+
+def print_stats(stats):
+    """Print one table row per scan cycle."""
+    header = (f"{'games':>7}{'cycle':>7}{'time s':>9}{'games/s':>10}{'reqs':>6}{'fetch p50':>11}"
+              f"{'fetch p99':>11}{'db ops':>8}{'notified':>10}{'failed':>8}{'notify p50':>12}{'notify p99':>12}")
+    print(header)
+    print("-" * len(header))
+    for row in stats:
+        print(f"{row['games']:>7}{row['cycle']:>7}{row['elapsed']:>9.2f}{row['games_per_sec']:>10.0f}"
+              f"{row['requests']:>6}{row['fetch_p50'] * 1000:>9.1f}ms{row['fetch_p99'] * 1000:>9.1f}ms"
+              f"{row['db_ops']:>8}{row['notified']:>10}{row['unavailable']:>8}"
+              f"{row['notify_p50'] * 1000:>10.1f}ms{row['notify_p99'] * 1000:>10.1f}ms")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scan cycles against local Steam and Discord stand-ins.")
+    parser.add_argument("--games", type=int, nargs="+", default=list(GAME_COUNTS), help="Watchlist sizes to scan")
+    parser.add_argument("--cycles", type=int, default=CYCLES, help="Scan cycles per watchlist size")
+    parser.add_argument("--steam-latency", type=float, default=STEAM_LATENCY, help="Seconds per Steam request")
+    parser.add_argument("--discord-latency", type=float, default=DISCORD_LATENCY, help="Seconds per webhook post")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--discount-rate", type=float, default=DISCOUNT_RATE, help="Fraction of games on sale")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for injected failures")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, APP_DIR)
+    # Keep injected failures from flooding the table; they show up in the failed column
+    logging.disable(logging.ERROR)
+
+    import discord
+    import scanner
+    from saved_games import initialize_database
+    from stand_in_servers import DiscordStandIn, SteamStandIn
+
+    steam = SteamStandIn(
+        catalog_size=max(args.games), discount_rate=args.discount_rate, latency=args.steam_latency,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    ).start()
+    discord_stand_in = DiscordStandIn(
+        latency=args.discord_latency, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    ).start()
+    scanner.STEAM_APPDETAILS_URL = steam.appdetails_url
+    # The stand-in webhook has no real limit, so only injected 429s slow delivery down
+    discord.configure_dispatcher(bucket_capacity=1000, bucket_refill_seconds=1)
+
+    stats = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            initialize_database()
+            for game_count in args.games:
+                stats.extend(run_cycles(game_count, args.cycles, discord_stand_in))
+            discord.get_dispatcher().stop()
+            import db
+            db.close_connections()
+            os.chdir(APP_DIR)
+    finally:
+        steam.stop()
+        discord_stand_in.stop()
+
+    print(f"Python {sys.version.split()[0]}, Steam latency {args.steam_latency * 1000:.0f} ms, "
+          f"error rate {args.error_rate:.1%}, 429 rate {args.rate_limit_rate:.1%}\n")
+    print_stats(stats)
+    print(f"\n{steam.requests} Steam requests, {discord_stand_in.messages} webhook messages "
+          f"({discord_stand_in.embeds} embeds)")
+
+if __name__ == "__main__":
+    main()
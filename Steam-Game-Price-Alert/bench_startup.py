@@ -0,0 +1,57 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Define constants
+COLD_START_RUNS = 10
+REDRAW_RUNS = 200
+GAME_COUNT = 50
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_cold_start(cwd):
+    """Median wall time of a fresh interpreter importing main, in milliseconds."""
+    timings = []
+    for _ in range(COLD_START_RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=cwd, check=True,
+                       env={**os.environ, "PYTHONPATH": APP_DIR})
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def measure_redraws():
+    """Time of the first main menu redraw and the median of the following ones, in milliseconds."""
+    import main
+    from saved_games import add_game, initialize_database
+
+    initialize_database()
+    with redirect_stdout(StringIO()):
+        for i in range(1, GAME_COUNT + 1):
+            add_game(f"Game {i}", f"https://store.steampowered.com/app/{i}/")
+
+    timings = []
+    for _ in range(REDRAW_RUNS):
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            main.render_main_menu()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings[0], statistics.median(timings[1:])
+
+def main():
+    sys.path.insert(0, APP_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        cold_start = measure_cold_start(tmp)
+        first_redraw, redraw = measure_redraws()
+    print(f"Python {sys.version.split()[0]}, {GAME_COUNT} saved games\n")
+    print(f"{'cold start (import main)':<28}{cold_start:>10.2f} ms")
+    print(f"{'first menu redraw':<28}{first_redraw:>10.2f} ms")
+    print(f"{'menu redraw (median)':<28}{redraw:>10.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+import scan_engine
+from saved_games import add_games, get_saved_app_ids, resolve_app_id
+
+# Define constants
+PROGRESS_INTERVAL = 0.25  # Seconds between progress line updates
+
+def read_entries(source):
+    """Read one Steam link or app ID per line from a file, or from stdin when source is '-'."""
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, "r") as file:
+            lines = file.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+def parse_entries(entries):
+    """Split entries into unique app IDs (in input order) and entries that could not be parsed."""
+    app_ids = {}
+    invalid = []
+    for entry in entries:
+        app_id = resolve_app_id(entry)
+        if app_id:
+            app_ids[app_id] = None
+        else:
+            invalid.append(entry)
+    return list(app_ids), invalid
+
+def import_games(source, country_code, language, concurrency=scan_engine.DEFAULT_CONCURRENCY):
+    """
+    Import a list of games from a file or stdin. Names are resolved
+    concurrently and every new game is inserted in a single transaction.
+    Returns a summary dict.
+    """
+    start = time.perf_counter()
+    app_ids, invalid = parse_entries(read_entries(source))
+    for entry in invalid:
+        print(f"Skipping invalid Steam link or app ID: {entry}")
+
+    saved = get_saved_app_ids()
+    new_ids = [app_id for app_id in app_ids if app_id not in saved]
+    print(f"{len(app_ids)} games read, {len(app_ids) - len(new_ids)} already saved, "
+          f"resolving {len(new_ids)} names...")
+
+    progress = {"done": 0, "printed_at": 0.0}
+    lock = threading.Lock()
+
+    def report_progress(app_id, details):
+        with lock:
+            progress["done"] += 1
+            now = time.perf_counter()
+            if progress["done"] < len(new_ids) and now - progress["printed_at"] < PROGRESS_INTERVAL:
+                return
+            progress["printed_at"] = now
+            rate = progress["done"] / (now - start)
+            sys.stderr.write(f"\rResolved {progress['done']}/{len(new_ids)} ({rate:.1f} games/sec)")
+            sys.stderr.flush()
+
+    details = scan_engine.resolve_details(new_ids, country_code, language,
+                                          concurrency=concurrency, on_done=report_progress)
+    if new_ids:
+        sys.stderr.write("\n")
+
+    rows = []
+    failed = []
+    for app_id in new_ids:
+        game_data = details.get(app_id)
+        if game_data:
+            rows.append((game_data.get('name', 'Unknown Game'), f"https://store.steampowered.com/app/{app_id}/", app_id,
+                         game_data.get('header_image')))
+        else:
+            failed.append(app_id)
+    added = add_games(rows) if rows else 0
+
+    elapsed = time.perf_counter() - start
+    for app_id in failed:
+        print(f"Failed to fetch game details for app {app_id}.")
+    print(f"Imported {added} games in {elapsed:.2f}s ({added / elapsed if elapsed else 0:.1f} games/sec).")
+    return {
+        "read": len(app_ids),
+        "invalid": len(invalid),
+        "already_saved": len(app_ids) - len(new_ids),
+        "added": added,
+        "failed": len(failed),
+        "elapsed": elapsed
+    }
@@ -0,0 +1,110 @@
+import json
+import re
+import db
+
+# Define constants
+CATALOG_DB_PATH = "app_catalog.db"
+SEARCH_LIMIT = 10
+CANDIDATE_LIMIT = 500  # Matches considered for ranking
+
+def initialize_catalog(path=CATALOG_DB_PATH):
+    """Create the app table and its full-text index, kept in sync by triggers."""
+    with db.transaction(path) as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS apps (
+                app_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL COLLATE NOCASE
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_apps_name ON apps (name)")
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS apps_fts USING fts5(
+                name,
+                content='apps',
+                content_rowid='app_id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='1 2 3'
+            )
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS apps_after_insert AFTER INSERT ON apps BEGIN
+                INSERT INTO apps_fts (rowid, name) VALUES (new.app_id, new.name);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS apps_after_update AFTER UPDATE OF name ON apps BEGIN
+                INSERT INTO apps_fts (apps_fts, rowid, name) VALUES ('delete', old.app_id, old.name);
+                INSERT INTO apps_fts (rowid, name) VALUES (new.app_id, new.name);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS apps_after_delete AFTER DELETE ON apps BEGIN
+                INSERT INTO apps_fts (apps_fts, rowid, name) VALUES ('delete', old.app_id, old.name);
+            END
+        ''')
+
+def parse_app_list(data):
+    """
+    Extract (app_id, name) pairs from a Steam app list dump. Accepts the
+    ISteamApps/GetAppList shape ({"applist": {"apps": [...]}}), the
+    IStoreService/GetAppList shape ({"response": {"apps": [...]}}) or a bare list.
+    """
+    if isinstance(data, dict):
+        data = (data.get("applist") or data.get("response") or data).get("apps", [])
+    apps = []
+    for app in data:
+        name = (app.get("name") or "").strip()
+        if name:
+            apps.append((int(app["appid"]), name))
+    return apps
+
+def ingest_dump(source, path=CATALOG_DB_PATH):
+    """
+    Merge an app list dump file into the catalog. Only new apps and renamed
+    apps are written, so importing a newer dump does not rebuild the index.
+    Returns (apps_in_dump, rows_changed).
+    """
+    with open(source, "r", encoding="utf-8") as file:
+        apps = parse_app_list(json.load(file))
+    initialize_catalog(path)
+    with db.transaction(path) as conn:
+        cursor = conn.executemany('''
+            INSERT INTO apps (app_id, name) VALUES (?, ?)
+            ON CONFLICT (app_id) DO UPDATE SET name = excluded.name WHERE name != excluded.name COLLATE BINARY
+        ''', apps)
+    return len(apps), cursor.rowcount
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query that prefix-matches every word."""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+def search(text, limit=SEARCH_LIMIT, path=CATALOG_DB_PATH):
+    """
+    Return up to limit (app_id, name) pairs whose names match every word of
+    text. Names starting with the text come first, then shorter names.
+    """
+    query = _fts_query(text)
+    if not query:
+        return []
+    # Names starting with the exact text come straight from the name index
+    needle = text.strip()
+    prefix_hits = db.fetchall(
+        "SELECT app_id, name FROM apps WHERE name LIKE ? ESCAPE '\\' ORDER BY length(name) LIMIT ?",
+        (re.sub(r"([%_\\])", r"\\\1", needle) + "%", limit), path=path
+    ) if len(needle) >= 3 else []
+    # Ranking every hit of a common word costs tens of ms, so rank a bounded candidate set instead
+    candidates = db.fetchall('''
+        SELECT apps.app_id, apps.name FROM apps_fts
+        JOIN apps ON apps.app_id = apps_fts.rowid
+        WHERE apps_fts MATCH ?
+        LIMIT ?
+    ''', (query, CANDIDATE_LIMIT), path=path)
+    candidates.sort(key=lambda app: (not app[1].lower().startswith(needle.lower()), len(app[1]), app[0]))
+    results = list(dict.fromkeys(prefix_hits + candidates))
+    return results[:limit]
+
+def catalog_size(path=CATALOG_DB_PATH):
+    """Number of apps in the catalog, 0 if it has not been created yet."""
+    initialize_catalog(path)
+    return db.fetchone("SELECT COUNT(*) FROM apps", path=path)[0]
@@ -0,0 +1,113 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+import metrics
+
+# Define constants
+DB_PATH = "saved_games.db"
+STATEMENT_CACHE_SIZE = 256  # Compiled statements kept per connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON"
+)
+
+_local = threading.local()
+
+def _thread_state():
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+        _local.transaction_depth = {}
+        _local.after_commit = {}  # path -> callbacks waiting for the open transaction to commit
+    return _local
+
+def get_connection(path=DB_PATH):
+    """
+    Return this thread's long-lived connection to the database at path.
+    Connections run in autocommit mode; use transaction() to group writes.
+    """
+    state = _thread_state()
+    conn = state.connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        state.connections[path] = conn
+        state.transaction_depth[path] = 0
+    return conn
+
+@contextmanager
+def transaction(path=DB_PATH):
+    """
+    Run the enclosed statements in one transaction, committing on success
+    and rolling back on error. Nested blocks join the outermost transaction.
+    """
+    conn = get_connection(path)
+    state = _thread_state()
+    if state.transaction_depth[path] > 0:
+        state.transaction_depth[path] += 1
+        try:
+            yield conn
+        finally:
+            state.transaction_depth[path] -= 1
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    state.transaction_depth[path] = 1
+    callbacks = state.after_commit[path] = []
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+    finally:
+        state.transaction_depth[path] = 0
+        del state.after_commit[path]
+    for callback in callbacks:
+        callback()
+
+def after_commit(callback, path=DB_PATH):
+    """
+    Call callback() once this thread's open transaction on path commits, so
+    in-memory caches never get ahead of the database. It is dropped if the
+    transaction rolls back, and called right away outside a transaction.
+    """
+    callbacks = _thread_state().after_commit.get(path)
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+@metrics.timed("db_op", op="execute")
+def execute(sql, params=(), path=DB_PATH):
+    """Execute one statement on this thread's connection and return the cursor."""
+    return get_connection(path).execute(sql, params)
+
+@metrics.timed("db_op", op="executemany")
+def executemany(sql, seq_of_params, path=DB_PATH):
+    """Execute one statement for every parameter set inside a single transaction."""
+    with transaction(path) as conn:
+        return conn.executemany(sql, seq_of_params)
+
+@metrics.timed("db_op", op="fetchone")
+def fetchone(sql, params=(), path=DB_PATH):
+    """Execute a query and return its first row, or None."""
+    return get_connection(path).execute(sql, params).fetchone()
+
+@metrics.timed("db_op", op="fetchall")
+def fetchall(sql, params=(), path=DB_PATH):
+    """Execute a query and return all rows."""
+    return get_connection(path).execute(sql, params).fetchall()
+
+def close_connections():
+    """Close every connection opened by the current thread."""
+    state = _thread_state()
+    for conn in state.connections.values():
+        conn.close()
+    state.connections.clear()
+    state.transaction_depth.clear()
+    state.after_commit.clear()
@@ -1,10 +1,27 @@
-import requests
 import logging
+import threading
+import time
+import uuid
+from collections import deque
+import http_client
+import metrics
+import outbox
 
 # Define color constants
 RED = 16711680
 GREEN = 32768
 
+# Define dispatcher constants
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord's limit per webhook message
+BUCKET_CAPACITY = 5  # Webhooks allow about 5 requests...
+BUCKET_REFILL_SECONDS = 2  # ...per 2 seconds
+MAX_SEND_ATTEMPTS = 5
+COALESCE_DELAY = 0.5  # Seconds to wait for more embeds before sending a message
+OUTBOX_BATCH_SIZE = 100  # Outbox rows claimed per batch
+OUTBOX_POLL_SECONDS = 5  # Checks for due retries and rows queued by other processes
+FLUSH_POLL_SECONDS = 0.05
+PRUNE_INTERVAL = 3600
+
 def construct_embed(game_name, current_price, discount_percent, image_url, app_id):
     """
     Construct a Discord embed based on the game details.
@@ -24,7 +41,259 @@ def construct_embed(game_name, current_price, discount_percent, image_url, app_i
         "image": {"url": image_url}
     }
 
-def send_discord_notification(
+class TokenBucket:
+    """Per-webhook token bucket that also honors Discord's rate-limit headers."""
+
+    def __init__(self, capacity=BUCKET_CAPACITY, refill_seconds=BUCKET_REFILL_SECONDS):
+        self.capacity = capacity
+        self.rate = capacity / refill_seconds
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self):
+        """Seconds to wait before the next request may be sent."""
+        now = time.monotonic()
+        self._refill(now)
+        token_wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(token_wait, self.blocked_until - now, 0.0)
+
+    def take(self):
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def block_for(self, seconds):
+        """Hold every request for this webhook for the given number of seconds."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """Pause until the bucket resets when Discord reports no remaining requests."""
+        try:
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset_after = headers.get("X-RateLimit-Reset-After")
+            if remaining is not None and reset_after is not None and int(remaining) == 0:
+                self.block_for(float(reset_after))
+        except (TypeError, ValueError):
+            logging.warning(f"Ignoring malformed rate-limit headers: {remaining!r}, {reset_after!r}")
+
+def _retry_after(response):
+    """Seconds Discord asked us to wait after a 429 response, 1 if it did not say clearly."""
+    try:
+        data = response.json()
+        if isinstance(data, dict) and "retry_after" in data:
+            return float(data["retry_after"])
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(response.headers.get("Retry-After", 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+class NotificationDispatcher:
+    """
+    Background sender for Discord notifications. Embeds are queued in the
+    durable outbox (see outbox.Outbox) and claimed in batches; those for the
+    same webhook are packed up to ten per message, and each webhook is
+    throttled by its own token bucket, so the scan loop never waits on
+    Discord. Failed messages stay in the outbox and are retried with backoff.
+    """
+
+    def __init__(self, max_embeds=MAX_EMBEDS_PER_MESSAGE, coalesce_delay=COALESCE_DELAY,
+                 bucket_capacity=BUCKET_CAPACITY, bucket_refill_seconds=BUCKET_REFILL_SECONDS, outbox=None):
+        self.max_embeds = max_embeds
+        self.coalesce_delay = coalesce_delay
+        self.bucket_capacity = bucket_capacity
+        self.bucket_refill_seconds = bucket_refill_seconds
+        self._outbox = outbox
+        self._buckets = {}
+        self._thread = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._busy = False
+        self._pruned_at = 0.0
+        self.stats = {"queued": 0, "sent": 0, "messages": 0, "rate_limited": 0, "failed": 0}
+        self.latencies = deque(maxlen=1000)  # Seconds from enqueue to delivery
+
+    @property
+    def outbox(self):
+        if self._outbox is None:
+            self._outbox = outbox.get_outbox()
+        return self._outbox
+
+    def start(self):
+        """Start the sender thread if it is not running. Notifications left from earlier runs are sent too."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="discord-dispatcher", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, webhook_url, bot_name, bot_avatar, embed, key=None):
+        """
+        Queue one embed for delivery under an idempotency key; an embed
+        whose key is still queued is dropped. Joins the caller's
+        db.transaction() if one is open.
+        """
+        if self.outbox.add(key or uuid.uuid4().hex, webhook_url, bot_name, bot_avatar, embed):
+            self.stats["queued"] += 1
+        self.start()
+        self._wake.set()
+
+    def flush(self):
+        """
+        Block until every embed that is due has been sent or scheduled for a
+        retry. Returns False early if the sender thread is not running.
+        """
+        self._wake.set()
+        while self._busy or self.outbox.pending(due_only=True):
+            if self._thread is None or not self._thread.is_alive():
+                logging.error("The Discord sender is not running; due notifications stay in the outbox.")
+                return False
+            time.sleep(FLUSH_POLL_SECONDS)
+        return True
+
+    def stop(self, timeout=30):
+        """Send what is due, then stop the sender thread. Anything left stays in the outbox."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            stopping = self._stopping.is_set()
+            if not stopping:
+                self._wake.wait(OUTBOX_POLL_SECONDS)
+                self._wake.clear()
+                # Give a burst of alerts a moment to arrive so they share messages
+                time.sleep(self.coalesce_delay)
+            try:
+                while self._drain_batch():
+                    pass
+                metrics.set_gauge("outbox_pending", self.outbox.pending())
+                if time.time() - self._pruned_at > PRUNE_INTERVAL:
+                    self.outbox.prune()
+                    self._pruned_at = time.time()
+            except Exception:
+                # E.g. a locked database; the rows stay in the outbox for the next poll
+                logging.exception("Unexpected error in the Discord sender")
+            if stopping:
+                return
+
+    def _drain_batch(self):
+        """Claim and send one batch of due embeds. Returns False when nothing was due."""
+        self._busy = True
+        try:
+            rows = self.outbox.claim(OUTBOX_BATCH_SIZE)
+            if not rows:
+                return False
+            claim = rows[0]["claim"]
+            groups = {}
+            for row in rows:
+                groups.setdefault((row["webhook_url"], row["bot_name"], row["bot_avatar"]), []).append(row)
+            for (webhook_url, bot_name, bot_avatar), group in groups.items():
+                for start in range(0, len(group), self.max_embeds):
+                    chunk = group[start:start + self.max_embeds]
+                    # Earlier messages may have outlasted the claim; skip rows another sender took over
+                    held = set(self.outbox.renew([row["id"] for row in chunk], claim))
+                    chunk = [row for row in chunk if row["id"] in held]
+                    if not chunk:
+                        continue
+                    payload = {
+                        "username": bot_name,
+                        "avatar_url": bot_avatar,
+                        "embeds": [row["embed"] for row in chunk]
+                    }
+                    row_ids = [row["id"] for row in chunk]
+                    try:
+                        error = self._send(webhook_url, payload)
+                    except Exception as e:
+                        # An unexpected response must not kill the sender thread
+                        logging.exception("Unexpected error sending a Discord notification")
+                        error = e
+                    if error is None:
+                        if self.outbox.mark_sent(row_ids, claim) < len(row_ids):
+                            logging.warning("Discord notifications outlasted their outbox claim and may be sent twice.")
+                        now = time.time()
+                        self.latencies.extend(now - row["created_at"] for row in chunk)
+                        self.stats["sent"] += len(chunk)
+                    else:
+                        dead = self.outbox.mark_failed(row_ids, claim, error)
+                        self.stats["failed"] += dead
+                        if dead:
+                            logging.error(f"Gave up on {dead} Discord notifications after {outbox.MAX_ATTEMPTS} attempts.")
+        finally:
+            self._busy = False
+        return True
+
+    def _send(self, webhook_url, payload):
+        """Post one message, waiting out rate limits. Returns None on success, or the error."""
+        import requests
+
+        bucket = self._buckets.get(webhook_url)
+        if bucket is None:
+            bucket = self._buckets[webhook_url] = TokenBucket(self.bucket_capacity, self.bucket_refill_seconds)
+        error = None
+        for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+            time.sleep(bucket.wait_time())
+            bucket.take()
+            try:
+                with metrics.track("discord_send"):
+                    response = http_client.post(webhook_url, json=payload)
+            except requests.RequestException as e:
+                logging.error(f"Error sending Discord notification (attempt {attempt}): {e}")
+                bucket.block_for(2 ** attempt)
+                error = e
+                continue
+            bucket.update_from_headers(response.headers)
+            if response.status_code == 429:
+                self.stats["rate_limited"] += 1
+                metrics.inc("discord_send_errors_total")
+                retry_after = _retry_after(response)
+                logging.warning(f"Discord rate limit hit, retrying in {retry_after:.2f}s")
+                bucket.block_for(retry_after)
+                error = "rate limited"
+                continue
+            try:
+                response.raise_for_status()
+            except requests.RequestException as e:
+                metrics.inc("discord_send_errors_total")
+                logging.error(f"Error sending Discord notification, will retry later: {e}")
+                return e
+            self.stats["messages"] += 1
+            metrics.inc("notifications_sent_total", len(payload["embeds"]))
+            logging.info(f"Sent {len(payload['embeds'])} notifications in one message.")
+            return None
+        logging.error(f"Discord notification failed {MAX_SEND_ATTEMPTS} times, will retry later.")
+        return error
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher():
+    """Return the shared notification dispatcher."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher()
+    return _dispatcher
+
+def configure_dispatcher(**kwargs):
+    """Replace the shared dispatcher with one built from kwargs, stopping the old one."""
+    global _dispatcher
+    dispatcher = NotificationDispatcher(**kwargs)
+    with _dispatcher_lock:
+        old_dispatcher, _dispatcher = _dispatcher, dispatcher
+    if old_dispatcher is not None:
+        old_dispatcher.stop()
+    return dispatcher
+
+def queue_discord_notification(
     game_name: str,
     current_price: float,
     discount_percent: float,
@@ -32,25 +301,15 @@ def send_discord_notification(
     webhook_url: str,
     bot_name: str,
     bot_avatar: str,
-    app_id: int
+    app_id: int,
+    idempotency_key: str = None
 ) -> None:
     """
-    Send a Discord notification about the sale or price target met.
+    Queue a Discord notification about the sale or price target met.
+    It is sent in the background, batched with other queued notifications.
     """
     embed = construct_embed(game_name, current_price, discount_percent, image_url, app_id)
-    payload = {
-        "username": bot_name,
-        "avatar_url": bot_avatar,
-        "embeds": [embed]
-    }
-
-    try:
-        logging.info("Sending Discord notification...")
-        response = requests.post(webhook_url, json=payload)
-        response.raise_for_status()
-        logging.info("Notification sent successfully.")
-    except requests.RequestException as e:
-        logging.error(f"Error sending Discord notification: {e}")
+    get_dispatcher().enqueue(webhook_url, bot_name, bot_avatar, embed, idempotency_key)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
\ No newline at end of file
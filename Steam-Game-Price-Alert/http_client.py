@@ -0,0 +1,116 @@
+import threading
+
+# Define constants
+POOL_SIZE = 10  # Keep-alive connections kept open per host
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # Sleeps 0.5s, 1s, 2s... between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "connections_opened": 0}
+_adapter_class = None
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+def _get_adapter_class():
+    """
+    Define the counting adapter on first use, so importing this module does
+    not import requests and urllib3 until the first network call.
+    """
+    global _adapter_class
+    if _adapter_class is not None:
+        return _adapter_class
+
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _new_conn(self):
+            _count("connections_opened")
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            _count("connections_opened")
+            return super()._new_conn()
+
+    class PooledAdapter(HTTPAdapter):
+        """HTTPAdapter that counts requests and newly opened connections."""
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": CountingHTTPConnectionPool,
+                "https": CountingHTTPSConnectionPool
+            }
+
+        def send(self, request, **kwargs):
+            _count("requests")
+            return super().send(request, **kwargs)
+
+    _adapter_class = PooledAdapter
+    return _adapter_class
+
+def _build_session(pool_size, max_retries, backoff_factor):
+    import requests
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = _get_adapter_class()(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def configure(pool_size=POOL_SIZE, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR):
+    """Rebuild the shared session with a new pool size and retry policy."""
+    global _session
+    session = _build_session(pool_size, max_retries, backoff_factor)
+    with _session_lock:
+        old_session, _session = _session, session
+    if old_session is not None:
+        old_session.close()
+    return session
+
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(POOL_SIZE, MAX_RETRIES, BACKOFF_FACTOR)
+    return _session
+
+def get(url, **kwargs):
+    """GET through the shared session with a default timeout."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().get(url, **kwargs)
+
+def post(url, **kwargs):
+    """POST through the shared session with a default timeout."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().post(url, **kwargs)
+
+def get_connection_stats():
+    """Return request and connection counters, including how many requests reused a connection."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["connections_reused"] = max(stats["requests"] - stats["connections_opened"], 0)
+    return stats
+
+def reset_connection_stats():
+    """Reset the request and connection counters, e.g. at the start of a scan cycle."""
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
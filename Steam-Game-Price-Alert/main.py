@@ -1,15 +1,18 @@
-import os
 import sys
-import requests
+import argparse
+import importlib.util
+import signal
+import threading
 import logging
-import time
+import http_client
+import profiling
+import price_history
 from saved_info import load_user_info, save_user_info
-from saved_games import initialize_database, add_game as add_game_to_db, remove_game, save_price_threshold, get_price_threshold, get_game_link
-from utils import get_all_games
-from scanner import scan_for_sales, scan_multiple_games, extract_app_id, get_game_details
-from pyfiglet import Figlet
-from discord import send_discord_notification
-from stop_spam import save_sale_reminder, is_sale_notified, remove_expired_sale
+from saved_games import initialize_database, add_game as add_game_to_db, remove_game, save_price_threshold, get_watchlist, find_game_id, resolve_app_id, save_scan_interval, save_alert_rule
+from utils import get_all_games, clear_screen, print_header, screen_frame
+from scanner import scan_multiple_games, scan_selected_games, get_game_details, run_scan_loop, run_worker_loop, MODE_THRESHOLD, MODE_SALE
+from shards import ShardLeases, SHARD_COUNT
+from discord import get_dispatcher
 
 # Define constants
 SLEEP_TIME = 3600  # 1 hour
@@ -18,20 +21,14 @@ LANGUAGE_PROMPT = "Enter the language code (e.g., en for English): "
 WEBHOOK_URL_PROMPT = "Enter your Discord webhook URL: "
 BOT_NAME_PROMPT = "Enter the bot name: "
 BOT_AVATAR_PROMPT = "Enter the bot avatar URL (e.g., a link to a PNG image): "
+DAEMON_MODES = {"threshold": MODE_THRESHOLD, "sale": MODE_SALE}
+DEFAULT_COUNTRY_CODE = "US"
+DEFAULT_LANGUAGE = "en"
 
 # Configure logging
 logging.basicConfig(filename='debug.log', level=logging.DEBUG,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
-def clear_screen():
-    """Clears the screen for better readability."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-def print_header(title):
-    """Prints a header with a cool design using ASCII art."""
-    f = Figlet(font='slant')
-    print("\033[1;34m" + f.renderText(title) + "\033[0m")
-
 def print_option(title, color_code="\033[0;33m"):
     """Prints an option with a nice design."""
     print(f"{color_code} {title}\033[0m")
@@ -70,102 +67,42 @@ def scan_for_sales_with_threshold(country_code, language, webhook_url, bot_name,
             return  # Return to menu
         elif 1 <= choice <= len(games):
             game_id, game_name = games[choice - 1]
-            game_link = get_game_link(game_id)
-            app_id = extract_app_id(game_link)
-            if app_id:
-                # Step 2: Scanning Mode Choice
-                clear_screen()
-                print_header("🔍 Choose Scanning Mode 🔍")
-                print("\n\033[1;36mChoose scanning mode:\033[0m")
-                print("\033[0;33m 1. Use price target (notify when price drops below a threshold)\033[0m")
-                print("\033[0;33m 2. Detect sales normally (notify for any discount)\033[0m")
-                mode_choice = get_user_input("\n\033[1;36mEnter a number (1-2): \033[0m")
-
-                # Step 3: Start Scanning
-                clear_screen()
-                print_header("🕵️‍♂️ Scanning in Progress 🕵️‍♂️")
-                print(f"\n\033[1;32mInitializing scan for '{game_name}'...\033[0m")
-                print("Press Ctrl+C to stop scanning and return to the menu.")
-                print("-------------------------------------------------")
-
-                try:
-                    while True:  # Infinite loop for continuous scanning
-                        hacker_text = "Fetching game details from Steam API..."
-                        print(f"\n\033[1;33m{hacker_text}\033[0m")
-                        game_data = get_game_details(app_id, country_code, language)
-                        if game_data and 'price_overview' in game_data:
-                            price_info = game_data['price_overview']
-                            current_price = price_info['final'] / 100  # Convert cents to dollars
-                            discount_percent = price_info['discount_percent']
-                            image_url = game_data['header_image']
-
-                            print(f"\n\033[1;36mGame: {game_name}\033[0m")
-                            print(f"\033[1;32mCurrent Price: ${current_price:.2f} USD\033[0m")
-                            print(f"\033[1;35mDiscount: {discount_percent}%\033[0m")
-
-                            if mode_choice == "1":
-                                # Use price target
-                                threshold = get_price_threshold(game_id)
-                                if threshold is not None and current_price <= threshold:
-                                    if not is_sale_notified(app_id):
-                                        print(f"\n\033[1;31mPrice target met! Current price: ${current_price:.2f} (Threshold: ${threshold:.2f})\033[0m")
-                                        send_discord_notification(
-                                            game_name=game_name,
-                                            current_price=current_price,
-                                            discount_percent=discount_percent,
-                                            image_url=image_url,
-                                            webhook_url=webhook_url,
-                                            bot_name=bot_name,
-                                            bot_avatar=bot_avatar,
-                                            app_id=app_id
-                                        )
-                                        save_sale_reminder(app_id, game_name, current_price, discount_percent)
-                                    else:
-                                        print("\nSale already notified. Skipping notification.")
-                                else:
-                                    print("\nPrice target not met. Skipping notification.")
-                                    if is_sale_notified(app_id):
-                                        remove_expired_sale(app_id)
-                            elif mode_choice == "2":
-                                # Detect sales normally
-                                if discount_percent > 0:
-                                    if not is_sale_notified(app_id):
-                                        print(f"\n\033[1;31mSale detected! Current price: ${current_price:.2f} ({discount_percent}% off)\033[0m")
-                                        send_discord_notification(
-                                            game_name=game_name,
-                                            current_price=current_price,
-                                            discount_percent=discount_percent,
-                                            image_url=image_url,
-                                            webhook_url=webhook_url,
-                                            bot_name=bot_name,
-                                            bot_avatar=bot_avatar,
-                                            app_id=app_id
-                                        )
-                                        save_sale_reminder(app_id, game_name, current_price, discount_percent)
-                                    else:
-                                        print("\nSale already notified. Skipping notification.")
-                                else:
-                                    print("\nNo sale detected. Skipping notification.")
-                                    if is_sale_notified(app_id):
-                                        remove_expired_sale(app_id)
-                            else:
-                                print("\n\033[1;31mInvalid mode choice. Try again.\033[0m")
-                                break
-
-                        print("\n-------------------------------------------------")
-                        print("Sleeping for 1 hour before checking again...\n")
-                        time.sleep(SLEEP_TIME)  # Wait 1 hour before checking again
-
-                except KeyboardInterrupt:
-                    print("\nScanning stopped. Returning to menu...")
-                    return  # Return to menu if user presses Ctrl+C
-            else:
-                print("\n[ERROR] Invalid game link.")
+            # Step 2: Scanning Mode Choice
+            clear_screen()
+            print_header("🔍 Choose Scanning Mode 🔍")
+            print("\n\033[1;36mChoose scanning mode:\033[0m")
+            print("\033[0;33m 1. Use price target (notify when price drops below a threshold)\033[0m")
+            print("\033[0;33m 2. Detect sales normally (notify for any discount)\033[0m")
+            mode_choice = get_user_input("\n\033[1;36mEnter a number (1-2): \033[0m")
+            if mode_choice not in (MODE_THRESHOLD, MODE_SALE):
+                print("\n\033[1;31mInvalid mode choice. Try again.\033[0m")
+                return
+
+            # Step 3: Start Scanning
+            scan_selected_games([game_id], mode_choice, country_code, language, webhook_url, bot_name, bot_avatar)
         else:
             print("\nInvalid choice. Try again.")
     except ValueError:
         print("\nPlease enter a valid number.")
 
+def render_main_menu():
+    """Draws the saved games list and menu options as a single frame."""
+    games = get_all_games()
+    with screen_frame():
+        print_header("🎮 Saved Games 🎮")
+        if games:
+            for index, (game_id, game_name) in enumerate(games, start=1):
+                print(f"\033[1;32m {index}. {game_name}\033[0m")
+        else:
+            print("\033[1;31m No games added yet.\033[0m")
+
+        print_header("Choose an Option:")
+        print_option("1. Scan for sales")
+        print_option("2. Add a new game")
+        print_option("3. Scan multiple games")
+        print_option("4. Remove a game")
+        print_option("5. Set price threshold")
+
 def main_menu():
     """Displays the main menu and handles user choices."""
     initialize_database()
@@ -181,26 +118,12 @@ def main_menu():
         bot_avatar = user_info["bot_avatar"]
 
     while True:
-        clear_screen()
-        print_header("🎮 Saved Games 🎮")
-        games = get_all_games()
-        if games:
-            for index, (game_id, game_name) in enumerate(games, start=1):
-                print(f"\033[1;32m {index}. {game_name}\033[0m")
-        else:
-            print("\033[1;31m No games added yet.\033[0m")
-
-        print_header("Choose an Option:")
-        print_option("1. Scan for sales")
-        print_option("2. Add a new game")
-        print_option("3. Scan multiple games")
-        print_option("4. Remove a game")
-        print_option("5. Set price threshold")
+        render_main_menu()
         choice = get_user_input("\033[1;36mEnter a number (1-5): \033[0m")
         if choice == "1":
             scan_for_sales_with_threshold(country_code, language, webhook_url, bot_name, bot_avatar)
         elif choice == "2":
-            add_game()
+            add_game(country_code, language)
         elif choice == "3":
             scan_multiple_games(country_code, language, webhook_url, bot_name, bot_avatar)
         elif choice == "4":
@@ -210,24 +133,25 @@ def main_menu():
         else:
             print("\n\033[1;31mInvalid option. Try again!\033[0m\n")
 
-def add_game():
+def add_game(country_code, language):
     """Handles adding a new game with an option to add more or return."""
     while True:
         clear_screen()
         print_header("Add a New Game")
-        steam_link = get_user_input("Enter Steam game link: ")
+        steam_link = get_user_input("Enter Steam game link, app ID or name to search: ")
         if not steam_link:
             print("\033[1;31mSteam link cannot be empty.\033[0m")
             continue
-        app_id = extract_app_id(steam_link)
+        app_id = resolve_app_id(steam_link) or pick_from_catalog(steam_link)
         if not app_id:
-            print("\033[1;31mInvalid Steam link. Please provide a valid Steam store link.\033[0m")
+            input("\nPress Enter to try again...")
             continue
-        game_data = get_game_details(app_id, "US", "en")
+        steam_link = f"https://store.steampowered.com/app/{app_id}/"
+        game_data = get_game_details(app_id, country_code, language)
         if game_data:
             game_name = game_data.get('name', 'Unknown Game')
-            add_game_to_db(game_name, steam_link)
-            print(f"\n\033[1;32m[OK] Game '{game_name}' added successfully!\033[0m\n")
+            if add_game_to_db(game_name, steam_link, game_data.get('header_image')):
+                print(f"\n\033[1;32m[OK] Game '{game_name}' added successfully!\033[0m\n")
         else:
             print("\033[1;31mFailed to fetch game details. Please try again.\033[0m")
             continue
@@ -238,6 +162,26 @@ def add_game():
         if next_choice == "2":
             break
 
+def pick_from_catalog(query):
+    """Searches the local app catalog by name and lets the user pick a match."""
+    import catalog
+
+    if not catalog.catalog_size():
+        print("\033[1;31mNot a Steam link, and the local catalog is empty.\033[0m")
+        print("Import a Steam app list with 'python3 main.py catalog import FILE' to search by name.")
+        return None
+    matches = catalog.search(query)
+    if not matches:
+        print(f"\033[1;31mNo games found matching '{query}'.\033[0m")
+        return None
+    print("\n\033[1;36mMatching games:\033[0m")
+    for index, (app_id, name) in enumerate(matches, start=1):
+        print(f"\033[1;33m {index}. {name} ({app_id})\033[0m")
+    choice = get_user_input("\n\033[1;36mEnter game number to add (or 0 to cancel): \033[0m")
+    if choice.isdigit() and 1 <= int(choice) <= len(matches):
+        return matches[int(choice) - 1][0]
+    return None
+
 def remove_game_menu():
     """Removes a game from the saved games list."""
     games = get_all_games()
@@ -300,8 +244,348 @@ def set_price_threshold():
         except ValueError:
             print("\n\033[1;31mPlease enter a valid number.\033[0m")
 
+def run_daemon(mode, interval, metrics_port=None, profile_dir=None, profile_cycles=1, near_low=None,
+               fetch_workers=None, evaluate_workers=None, notify_workers=None, specials=False,
+               shards=None, worker_id=None, api_port=None):
+    """
+    Scans the whole watchlist on a schedule without the menu until SIGTERM or Ctrl+C.
+    With metrics_port, metrics are served on http://127.0.0.1:<port>/metrics.
+    With profile_dir, the first profile_cycles cycles are profiled into that directory.
+    With near_low, only prices within near_low percent of a game's all-time low notify.
+    The *_workers arguments override the worker count of each scan pipeline stage.
+    With specials, games missing from the store's specials listing are only swept daily.
+    With shards, runs as one of several workers sharing the watchlist (see shards.ShardLeases).
+    With api_port, the latest prices are served on http://127.0.0.1:<port>/prices.
+    """
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, force=True,
+                        format='%(asctime)s level=%(levelname)s %(message)s')
+    user_info = load_user_info()
+    if not user_info:
+        logging.error("event=config_missing file=user_info.json")
+        return 1
+    if near_low is not None and not near_low > 0:
+        logging.error(f"event=option_invalid option=--near-low value={near_low} reason=\"must be positive\"")
+        return 1
+    if near_low is not None and importlib.util.find_spec("numpy") is None:  # Needed by analytics on every cycle
+        logging.error("event=dependency_missing package=numpy option=--near-low")
+        return 1
+    initialize_database()
+    if fetch_workers is not None or evaluate_workers is not None or notify_workers is not None:
+        import scan_engine
+        scan_engine.configure(fetch_concurrency=fetch_workers, evaluate_concurrency=evaluate_workers,
+                              notify_concurrency=notify_workers)
+    if fetch_workers is not None and fetch_workers > http_client.POOL_SIZE:
+        http_client.configure(pool_size=fetch_workers)  # One keep-alive connection per fetch worker
+    metrics_server = None
+    if metrics_port is not None:
+        import metrics
+        metrics_server = metrics.start_server(metrics_port)
+    api_server = None
+    if api_port is not None:
+        import snapshot
+        api_server = snapshot.start_server(api_port)
+    profiler = None
+    if profile_dir:
+        profiler = profiling.CycleProfiler(profile_dir, profile_cycles)
+    prefilter = None
+    if specials:
+        from specials import SpecialsPrefilter
+        prefilter = SpecialsPrefilter(user_info["country_code"], user_info["language"])
+
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logging.info(f"event=shutdown_requested signal={signal.Signals(signum).name}")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    def log_cycle(results, elapsed):
+        for result in results:
+            if result["status"] in ("notified", "ended", "unavailable", "failed"):
+                logging.info(
+                    f"event=game_{result['status']} app_id={result['app_id']} "
+                    f"price={result['current_price']} discount={result['discount_percent']}"
+                )
+        notified = sum(1 for result in results if result["status"] == "notified")
+        unavailable = sum(1 for result in results if result["status"] == "unavailable")
+        failed = sum(1 for result in results if result["status"] == "failed")
+        logging.info(
+            f"event=cycle_complete games={len(results)} notified={notified} "
+            f"unavailable={unavailable} failed={failed} duration={elapsed:.2f} {profiling.format_stages(profiling.last_stages())}"
+        )
+
+    near_low_ratio = None if near_low is None else near_low / 100
+    get_dispatcher().start()  # Delivers notifications still in the outbox from earlier runs
+    if shards:
+        try:
+            leases = ShardLeases(worker_id, shards)
+        except ValueError as e:
+            logging.error(f"event=worker_config_error error=\"{e}\"")
+            return 1
+        logging.info(f"event=worker_started worker={leases.worker_id} shards={shards} mode={mode} interval={interval}")
+        run_worker_loop(get_watchlist, DAEMON_MODES[mode], user_info["country_code"], user_info["language"],
+                        user_info["webhook_url"], user_info["bot_name"], user_info["bot_avatar"], leases,
+                        interval=interval, stop_event=stop_event, on_cycle=log_cycle, profiler=profiler,
+                        near_low_ratio=near_low_ratio, prefilter=prefilter)
+    else:
+        logging.info(f"event=daemon_started mode={mode} interval={interval}")
+        run_scan_loop(get_watchlist, DAEMON_MODES[mode], user_info["country_code"], user_info["language"],
+                      user_info["webhook_url"], user_info["bot_name"], user_info["bot_avatar"],
+                      interval=interval, stop_event=stop_event, on_cycle=log_cycle, profiler=profiler,
+                      near_low_ratio=near_low_ratio, prefilter=prefilter)
+    get_dispatcher().stop()
+    price_history.close_history()
+    if metrics_server:
+        metrics_server.shutdown()
+    if api_server:
+        api_server.shutdown()
+    logging.info(f"event=daemon_stopped notifications_sent={get_dispatcher().stats['sent']}")
+    return 0
+
+def add_games_command(games):
+    """Adds games given as store links or app IDs without the menu."""
+    initialize_database()
+    user_info = load_user_info() or {}
+    country_code = user_info.get("country_code", DEFAULT_COUNTRY_CODE)
+    language = user_info.get("language", DEFAULT_LANGUAGE)
+    failed = 0
+    for game in games:
+        app_id = resolve_app_id(game)
+        if not app_id:
+            print(f"Invalid Steam link or app ID: {game}")
+            failed += 1
+            continue
+        game_data = get_game_details(app_id, country_code, language)
+        if not game_data:
+            print(f"Failed to fetch game details for app {app_id}.")
+            failed += 1
+            continue
+        add_game_to_db(game_data.get('name', 'Unknown Game'), f"https://store.steampowered.com/app/{app_id}/",
+                       game_data.get('header_image'))
+    return 1 if failed else 0
+
+def catalog_command(action, argument):
+    """Imports a Steam app list dump into the local catalog, or searches it."""
+    import catalog
+
+    if action == "import":
+        apps, changed = catalog.ingest_dump(argument)
+        print(f"Catalog updated: {apps} apps in dump, {changed} new or renamed, "
+              f"{catalog.catalog_size()} apps total.")
+        return 0
+    for app_id, name in catalog.search(argument):
+        print(f"{app_id}\t{name}")
+    return 0
+
+def import_command(source, concurrency):
+    """Bulk imports games from a file or stdin without the menu."""
+    from bulk_import import import_games  # Pulls in the scan engine only when needed
+
+    if concurrency > http_client.POOL_SIZE:
+        http_client.configure(pool_size=concurrency)  # Otherwise connections beyond the pool are closed after each lookup
+    initialize_database()
+    user_info = load_user_info() or {}
+    summary = import_games(source, user_info.get("country_code", DEFAULT_COUNTRY_CODE),
+                           user_info.get("language", DEFAULT_LANGUAGE), concurrency=concurrency)
+    return 1 if summary["failed"] or summary["invalid"] else 0
+
+def report_command(days, near_low):
+    """Prints price statistics for every saved game from the recorded price history."""
+    if importlib.util.find_spec("numpy") is None:
+        print("The report needs NumPy: pip install numpy")
+        return 1
+    import analytics
+
+    initialize_database()
+    games = get_watchlist()
+    stats = analytics.summarize([app_id for _, _, app_id, _ in games], window_days=days,
+                                near_low_ratio=near_low / 100)
+    print(f"{'Game':<40}{'Price':>10}{'Disc':>6}{'Low':>10}{f'{days}d low':>10}{'Median':>10}")
+    for _, game_name, app_id, _ in games:
+        game = stats.get(app_id)
+        if game is None:
+            print(f"{game_name[:39]:<40}{'no price history yet':>46}")
+            continue
+        marker = "\033[1;32mAT LOW\033[0m" if game["near_low"] else ""
+        print(f"{game_name[:39]:<40}{game['current'] / 100:>10.2f}{game['current_discount']:>5}%"
+              f"{game['all_time_low'] / 100:>10.2f}{game['window_low'] / 100:>10.2f}"
+              f"{game['median'] / 100:>10.2f}  {marker}")
+    return 0
+
+def remove_games_command(app_ids):
+    """Removes games by Steam app ID without the menu."""
+    initialize_database()
+    missing = 0
+    for app_id in app_ids:
+        game_id = find_game_id(app_id)
+        if game_id is None:
+            print(f"No saved game with app ID {app_id}.")
+            missing += 1
+            continue
+        remove_game(game_id)
+    return 1 if missing else 0
+
+def threshold_command(app_id, threshold):
+    """Sets a price threshold by Steam app ID without the menu."""
+    initialize_database()
+    if threshold <= 0:
+        print("Price threshold must be greater than zero.")
+        return 1
+    game_id = find_game_id(app_id)
+    if game_id is None:
+        print(f"No saved game with app ID {app_id}.")
+        return 1
+    save_price_threshold(game_id, threshold)
+    return 0
+
+def interval_command(app_id, seconds):
+    """Sets how often a game is checked by Steam app ID. 0 restores the default."""
+    initialize_database()
+    if seconds < 0:
+        print("Scan interval cannot be negative.")
+        return 1
+    game_id = find_game_id(app_id)
+    if game_id is None:
+        print(f"No saved game with app ID {app_id}.")
+        return 1
+    save_scan_interval(game_id, seconds or None)
+    return 0
+
+def rule_command(app_id, rule):
+    """Sets the alert rule of a game by Steam app ID. 'default' restores the mode's rule."""
+    from rules import compile_rule
+
+    initialize_database()
+    if rule.strip().lower() == "default":
+        rule = None
+    else:
+        try:
+            rule = compile_rule(rule).spec
+        except ValueError as e:
+            print(e)
+            return 1
+    game_id = find_game_id(app_id)
+    if game_id is None:
+        print(f"No saved game with app ID {app_id}.")
+        return 1
+    save_alert_rule(game_id, rule)
+    return 0
+
+def positive_int(value):
+    """argparse type for counts and intervals that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def parse_args(argv=None):
+    """Parses the command line. Without a subcommand the interactive menu starts."""
+    parser = argparse.ArgumentParser(description="Steam Game Price Alert")
+    subparsers = parser.add_subparsers(dest="command")
+
+    scan_options = argparse.ArgumentParser(add_help=False)
+    scan_options.add_argument("--mode", choices=sorted(DAEMON_MODES), default="sale",
+                              help="notify on price thresholds or on any discount (default: sale)")
+    scan_options.add_argument("--interval", type=positive_int, default=SLEEP_TIME,
+                              help=f"default seconds between checks of a game (default: {SLEEP_TIME})")
+    scan_options.add_argument("--metrics-port", type=int,
+                              help="serve Prometheus metrics on 127.0.0.1 at this port (/metrics and /metrics.json)")
+    scan_options.add_argument("--api-port", type=int,
+                              help="serve the latest prices as JSON on 127.0.0.1 at this port (/prices)")
+    scan_options.add_argument("--near-low", type=float, metavar="PERCENT",
+                              help="only notify when a price is within PERCENT of its all-time low (needs numpy)")
+    scan_options.add_argument("--profile-dir",
+                              help="write cProfile and tracemalloc reports of the first cycles to this directory")
+    scan_options.add_argument("--profile-cycles", type=positive_int, default=1,
+                              help="number of cycles to profile with --profile-dir (default: 1)")
+    scan_options.add_argument("--fetch-workers", type=positive_int,
+                              help="concurrent Steam price requests (default: 8)")
+    scan_options.add_argument("--evaluate-workers", type=positive_int,
+                              help="threads checking fetched prices against alert rules (default: 1)")
+    scan_options.add_argument("--notify-workers", type=positive_int,
+                              help="threads queueing Discord alerts and saving alert state (default: 1)")
+    scan_options.add_argument("--specials", action="store_true",
+                              help="only fetch games listed on special, plus games with active alerts and a daily sweep")
+
+    subparsers.add_parser("daemon", parents=[scan_options],
+                          help="scan the whole watchlist on a schedule without the menu")
+    worker_parser = subparsers.add_parser("worker", parents=[scan_options],
+                                          help="scan shards of the watchlist alongside other worker processes")
+    worker_parser.add_argument("--shards", type=positive_int, default=SHARD_COUNT,
+                               help=f"watchlist shards shared by all workers, the same for every worker (default: {SHARD_COUNT})")
+    worker_parser.add_argument("--worker-id", help="name of this worker in the lease table (default: host-pid)")
+
+    add_parser = subparsers.add_parser("add", help="add games by store link or app ID")
+    add_parser.add_argument("games", nargs="+", help="Steam store links or app IDs")
+
+    import_parser = subparsers.add_parser("import", help="bulk import games from a file of links or app IDs")
+    import_parser.add_argument("source", help="file with one Steam link or app ID per line, or - for stdin")
+    import_parser.add_argument("--concurrency", type=positive_int, default=8,
+                               help="name lookups in flight at once (default: 8)")
+
+    catalog_parser = subparsers.add_parser("catalog", help="manage the local Steam app catalog used for search")
+    catalog_subparsers = catalog_parser.add_subparsers(dest="catalog_action", required=True)
+    catalog_import_parser = catalog_subparsers.add_parser("import", help="merge a Steam GetAppList JSON dump")
+    catalog_import_parser.add_argument("argument", metavar="file", help="path to the JSON dump")
+    catalog_search_parser = catalog_subparsers.add_parser("search", help="search app names")
+    catalog_search_parser.add_argument("argument", metavar="query", help="words to search for")
+
+    report_parser = subparsers.add_parser("report", help="summarize price history for every saved game (needs numpy)")
+    report_parser.add_argument("--days", type=int, default=30, help="window of the recent low (default: 30)")
+    report_parser.add_argument("--near-low", type=float, default=5, metavar="PERCENT",
+                               help="mark games within PERCENT of their all-time low (default: 5)")
+
+    remove_parser = subparsers.add_parser("remove", help="remove games by app ID")
+    remove_parser.add_argument("app_ids", nargs="+", type=int, help="Steam app IDs")
+
+    threshold_parser = subparsers.add_parser("threshold", help="set the price threshold of a game")
+    threshold_parser.add_argument("app_id", type=int, help="Steam app ID")
+    threshold_parser.add_argument("price", type=float, help="price threshold")
+
+    rule_parser = subparsers.add_parser("rule", help="set the alert rule of a game")
+    rule_parser.add_argument("app_id", type=int, help="Steam app ID")
+    rule_parser.add_argument("rule", help='e.g. "price <= 19.99 and discount >= 50 or low <= 5", or default')
+
+    interval_parser = subparsers.add_parser("interval", help="set how often a game is checked")
+    interval_parser.add_argument("app_id", type=int, help="Steam app ID")
+    interval_parser.add_argument("seconds", type=int, help="seconds between checks, 0 for the default")
+
+    return parser.parse_args(argv)
+
+def run_command(args):
+    """Runs a non-interactive subcommand and returns its exit code."""
+    if args.command in ("daemon", "worker"):
+        return run_daemon(args.mode, args.interval, args.metrics_port, args.profile_dir, args.profile_cycles,
+                          args.near_low, args.fetch_workers, args.evaluate_workers, args.notify_workers,
+                          args.specials, getattr(args, "shards", None), getattr(args, "worker_id", None),
+                          args.api_port)
+    if args.command == "add":
+        return add_games_command(args.games)
+    if args.command == "import":
+        return import_command(args.source, args.concurrency)
+    if args.command == "catalog":
+        return catalog_command(args.catalog_action, args.argument)
+    if args.command == "report":
+        return report_command(args.days, args.near_low)
+    if args.command == "remove":
+        return remove_games_command(args.app_ids)
+    if args.command == "threshold":
+        return threshold_command(args.app_id, args.price)
+    if args.command == "rule":
+        return rule_command(args.app_id, args.rule)
+    if args.command == "interval":
+        return interval_command(args.app_id, args.seconds)
+    return 0
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
+        if args.command:
+            sys.exit(run_command(args))
         main_menu()
     except Exception as e:
-        logging.error(f"[ERROR] An error occurred: {e}")
\ No newline at end of file
+        logging.error(f"[ERROR] An error occurred: {e}")
+        if args.command:
+            sys.exit(1)
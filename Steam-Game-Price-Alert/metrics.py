@@ -0,0 +1,225 @@
+import bisect
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Define constants
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+METRICS_HOST = "127.0.0.1"
+
+HELP = {
+    "steam_requests_total": "Steam store API requests by endpoint.",
+    "steam_request_errors_total": "Steam store API requests that failed.",
+    "steam_request_seconds": "Steam store API request latency.",
+    "dedup_ops_total": "Notification dedup store calls by operation.",
+    "dedup_op_errors_total": "Notification dedup store calls that raised.",
+    "dedup_op_seconds": "Notification dedup store call latency.",
+    "db_ops_total": "SQLite helper calls by operation.",
+    "db_op_errors_total": "SQLite helper calls that raised.",
+    "db_op_seconds": "SQLite helper call latency.",
+    "discord_sends_total": "Discord webhook posts.",
+    "discord_send_errors_total": "Discord webhook posts that failed or were rate limited.",
+    "discord_send_seconds": "Discord webhook post latency.",
+    "notifications_sent_total": "Game notifications delivered to Discord.",
+    "scan_cycles_total": "Completed scan cycles.",
+    "scan_cycle_errors_total": "Scan cycles that failed with an unexpected error.",
+    "scan_cycle_seconds": "Scan cycle duration.",
+    "scan_cycle_games": "Games checked in the last scan cycle.",
+    "scan_last_cycle_seconds": "Duration of the last scan cycle.",
+    "scan_last_cycle_timestamp": "Unix time the last scan cycle finished.",
+    "scan_interval_seconds": "Configured default scan interval.",
+    "pipeline_queue_depth": "Items waiting between scan pipeline stages.",
+    "pipeline_queue_max_depth": "Deepest pipeline queue in the last scan cycle.",
+    "scan_stage_seconds": "Time spent in each scan stage per cycle.",
+    "specials_listed_apps": "Discounted apps in the last specials listing.",
+    "specials_skipped_games_total": "Due games not fetched because they were not on special.",
+    "worker_shards_scanned_total": "Watchlist shards scanned by this worker.",
+    "worker_shard_errors_total": "Shard scans that failed with an unexpected error.",
+    "outbox_pending": "Discord notifications waiting in the outbox for delivery or a retry."
+}
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper_bound, cumulative_count) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def to_json(self):
+        """Snapshot every metric as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "gauges": [{"name": name, "labels": dict(labels), "value": value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+                "histograms": [{"name": name, "labels": dict(labels), "count": histogram.count,
+                                "sum": histogram.sum,
+                                "buckets": {str(bound): count for bound, count in histogram.cumulative()}}
+                               for (name, labels), histogram in sorted(self.histograms.items())]
+            }
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                header(name, "gauge")
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                header(name, "histogram")
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+_registry = MetricsRegistry()
+
+def get_registry():
+    """Return the process-wide metrics registry."""
+    return _registry
+
+def inc(name, value=1, **labels):
+    _registry.inc(name, value, **labels)
+
+def set_gauge(name, value, **labels):
+    _registry.set(name, value, **labels)
+
+def observe(name, value, **labels):
+    _registry.observe(name, value, **labels)
+
+@contextmanager
+def track(prefix, **labels):
+    """
+    Record <prefix>s_total, <prefix>_errors_total and a <prefix>_seconds
+    latency histogram for the enclosed block.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _registry.inc(f"{prefix}_errors_total", **labels)
+        raise
+    finally:
+        _registry.inc(f"{prefix}s_total", **labels)
+        _registry.observe(f"{prefix}_seconds", time.perf_counter() - start, **labels)
+
+def timed(prefix, **labels):
+    """Decorator that tracks every call of the wrapped function, see track()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(prefix, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_cycle(games, elapsed):
+    """Record one completed scan cycle."""
+    _registry.inc("scan_cycles_total")
+    _registry.observe("scan_cycle_seconds", elapsed)
+    _registry.set("scan_cycle_games", games)
+    _registry.set("scan_last_cycle_seconds", elapsed)
+    _registry.set("scan_last_cycle_timestamp", time.time())
+
+def start_server(port, host=METRICS_HOST):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json from a background
+    thread. Returns the server; call shutdown() on it to stop.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body = _registry.to_prometheus().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = json.dumps(_registry.to_json()).encode()
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logging.info(f"event=metrics_server_started address=http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+import time
+import db
+import metrics
+
+# Record kinds, one per legacy JSON store
+REMINDER = "reminder"  # Threshold/sale reminders, formerly sale_reminder.json
+SALE = "sale"  # Notified sales, formerly saved_sale.json
+RULE = "rule"  # Games notified by their own alert rule
+
+LEGACY_FILES = {
+    REMINDER: "sale_reminder.json",
+    SALE: "saved_sale.json"
+}
+
+class NotificationState:
+    """
+    Which games have already been notified, kept in a dict for O(1) lookups
+    and written through to an indexed SQLite table one row at a time.
+    """
+
+    def __init__(self, path=db.DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS notification_state (
+                kind TEXT NOT NULL,
+                app_id TEXT NOT NULL,
+                game_name TEXT NOT NULL,
+                current_price REAL,
+                discount_percent INTEGER,
+                notified_at REAL NOT NULL,
+                PRIMARY KEY (kind, app_id)
+            )
+        ''', path=path)
+        self._migrate_legacy_files()
+        self._records = {}  # (kind, app_id) -> record dict
+        self.reload()
+
+    def _migrate_legacy_files(self):
+        """Import the old JSON stores once, then rename them out of the way."""
+        for kind, filename in LEGACY_FILES.items():
+            if not os.path.exists(filename):
+                continue
+            try:
+                with open(filename, "r") as file:
+                    legacy = json.load(file)
+            except Exception as e:
+                logging.error(f"Error reading {filename} for migration: {e}")
+                continue
+            rows = [
+                (kind, str(app_id), record.get("game_name", ""), record.get("current_price"),
+                 record.get("discount_percent"), time.time())
+                for app_id, record in legacy.items()
+            ]
+            with db.transaction(self.path) as conn:
+                conn.executemany("INSERT OR IGNORE INTO notification_state VALUES (?, ?, ?, ?, ?, ?)", rows)
+            os.replace(filename, filename + ".migrated")
+            logging.info(f"Migrated {len(rows)} records from {filename}")
+
+    def reload(self):
+        """Reload every record from the database, e.g. after another process changed it."""
+        rows = db.fetchall(
+            "SELECT kind, app_id, game_name, current_price, discount_percent, notified_at FROM notification_state",
+            path=self.path
+        )
+        records = {
+            (kind, app_id): {
+                "game_name": game_name,
+                "current_price": current_price,
+                "discount_percent": discount_percent,
+                "notified_at": notified_at
+            }
+            for kind, app_id, game_name, current_price, discount_percent, notified_at in rows
+        }
+        with self._lock:
+            self._records = records
+
+    @metrics.timed("dedup_op", op="is_notified")
+    def is_notified(self, kind, app_id):
+        """Check if a notification was already recorded for this app."""
+        return (kind, str(app_id)) in self._records
+
+    def get(self, kind, app_id):
+        """Return the recorded notification for this app, or None."""
+        record = self._records.get((kind, str(app_id)))
+        return dict(record) if record else None
+
+    @metrics.timed("dedup_op", op="mark")
+    def mark(self, kind, app_id, game_name, current_price, discount_percent):
+        """
+        Record that a notification was sent for this app. Inside a
+        db.transaction() the in-memory record is only updated once it commits.
+        """
+        key = (kind, str(app_id))
+        record = {
+            "game_name": game_name,
+            "current_price": current_price,
+            "discount_percent": discount_percent,
+            "notified_at": time.time()
+        }
+        db.execute(
+            "INSERT OR REPLACE INTO notification_state VALUES (?, ?, ?, ?, ?, ?)",
+            key + (game_name, current_price, discount_percent, record["notified_at"]),
+            path=self.path
+        )
+        db.after_commit(lambda: self._set(key, record), path=self.path)
+
+    @metrics.timed("dedup_op", op="clear")
+    def clear(self, kind, app_id):
+        """Forget the notification for this app. Returns True if there was one."""
+        key = (kind, str(app_id))
+        if key not in self._records:
+            return False
+        db.execute("DELETE FROM notification_state WHERE kind = ? AND app_id = ?", key, path=self.path)
+        db.after_commit(lambda: self._set(key, None), path=self.path)
+        return True
+
+    def _set(self, key, record):
+        with self._lock:
+            if record is None:
+                self._records.pop(key, None)
+            else:
+                self._records[key] = record
+
+    def records(self, kind):
+        """Return a copy of every record of one kind, keyed by app ID."""
+        with self._lock:
+            return {
+                app_id: dict(record)
+                for (record_kind, app_id), record in self._records.items()
+                if record_kind == kind
+            }
+
+    def notified_app_ids(self):
+        """Return the app IDs with a recorded notification of any kind."""
+        with self._lock:
+            return {int(app_id) for _, app_id in self._records}
+
+_state = None
+_state_lock = threading.Lock()
+
+def get_state():
+    """Return the shared notification state, loading it on first use."""
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = NotificationState()
+    return _state
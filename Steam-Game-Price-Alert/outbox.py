@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+import uuid
+import db
+
+# Define constants
+CLAIM_SECONDS = 120  # A claimed row is handed out again if its sender does not renew or report back in time
+RETRY_BASE = 30  # First retry after a failed delivery, doubled on each failure
+MAX_RETRY_DELAY = 3600
+MAX_ATTEMPTS = 12  # About half a day of retries before a notification is given up on
+SENT_RETENTION = 7 * 24 * 3600  # Delivered and dead rows are kept this long for inspection
+
+# Row statuses
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"
+
+class Outbox:
+    """
+    Durable queue of Discord notifications in the games database. Rows are
+    written by the scanner in the same transaction as the dedup record, and
+    claimed in batches by a sender that reports each delivery back, so an
+    alert survives failed webhooks, crashes and restarts. Each row has an
+    idempotency key, and a key that is still pending is not queued twice.
+    A claim carries a token: once it expires and another sender claims the
+    rows, the first sender can no longer renew them or report them back.
+    """
+
+    def __init__(self, path=db.DB_PATH):
+        self.path = path
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                webhook_url TEXT NOT NULL,
+                bot_name TEXT,
+                bot_avatar TEXT,
+                embed TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                sent_at REAL,
+                last_error TEXT,
+                claimed_by TEXT
+            )
+        ''', path=path)
+        with db.transaction(path) as conn:  # Serializes the migration when several workers start at once
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(notification_outbox)")}
+            if "claimed_by" not in columns:
+                conn.execute("ALTER TABLE notification_outbox ADD COLUMN claimed_by TEXT")
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_due ON notification_outbox (status, next_attempt_at)", path=path
+        )
+
+    def add(self, key, webhook_url, bot_name, bot_avatar, embed, now=None):
+        """
+        Queue one embed. Joins the caller's db.transaction() if one is open.
+        Returns False if the key is already pending. A key that was sent or
+        given up on before is queued again as a new notification.
+        """
+        now = time.time() if now is None else now
+        cursor = db.execute(
+            "INSERT INTO notification_outbox "
+            "(idempotency_key, webhook_url, bot_name, bot_avatar, embed, status, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (idempotency_key) DO UPDATE SET webhook_url = excluded.webhook_url, "
+            "bot_name = excluded.bot_name, bot_avatar = excluded.bot_avatar, embed = excluded.embed, "
+            "status = excluded.status, attempts = 0, next_attempt_at = excluded.next_attempt_at, "
+            "created_at = excluded.created_at, sent_at = NULL, last_error = NULL, claimed_by = NULL "
+            "WHERE notification_outbox.status != ?",
+            (key, webhook_url, bot_name, bot_avatar, json.dumps(embed), PENDING, now, now, PENDING),
+            path=self.path
+        )
+        return cursor.rowcount == 1
+
+    def claim(self, limit, now=None):
+        """
+        Claim up to limit due rows for delivery, oldest first. Returns dicts
+        with id, webhook_url, bot_name, bot_avatar, embed, created_at and
+        claim, the token to pass to renew, mark_sent and mark_failed.
+        """
+        now = time.time() if now is None else now
+        claim = uuid.uuid4().hex
+        with db.transaction(self.path) as conn:
+            rows = conn.execute(
+                "SELECT id, webhook_url, bot_name, bot_avatar, embed, created_at FROM notification_outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE notification_outbox SET next_attempt_at = ?, claimed_by = ? WHERE id = ?",
+                [(now + CLAIM_SECONDS, claim, row[0]) for row in rows]
+            )
+        return [
+            {
+                "id": row_id,
+                "webhook_url": webhook_url,
+                "bot_name": bot_name,
+                "bot_avatar": bot_avatar,
+                "embed": json.loads(embed),
+                "created_at": created_at,
+                "claim": claim
+            }
+            for row_id, webhook_url, bot_name, bot_avatar, embed, created_at in rows
+        ]
+
+    def renew(self, row_ids, claim, now=None):
+        """
+        Extend the claim on rows about to be sent. Returns the IDs still held
+        by claim; the others were claimed by another sender after it expired.
+        """
+        now = time.time() if now is None else now
+        with db.transaction(self.path) as conn:
+            held = []
+            for row_id in row_ids:
+                cursor = conn.execute(
+                    "UPDATE notification_outbox SET next_attempt_at = ? WHERE id = ? AND claimed_by = ? AND status = ?",
+                    (now + CLAIM_SECONDS, row_id, claim, PENDING)
+                )
+                if cursor.rowcount:
+                    held.append(row_id)
+        return held
+
+    def mark_sent(self, row_ids, claim, now=None):
+        """Record the delivery of rows still held by claim. Returns how many were recorded."""
+        now = time.time() if now is None else now
+        with db.transaction(self.path) as conn:
+            recorded = 0
+            for row_id in row_ids:
+                recorded += conn.execute(
+                    "UPDATE notification_outbox SET status = ?, sent_at = ?, attempts = attempts + 1, claimed_by = NULL "
+                    "WHERE id = ? AND claimed_by = ? AND status = ?",
+                    (SENT, now, row_id, claim, PENDING)
+                ).rowcount
+        return recorded
+
+    def mark_failed(self, row_ids, claim, error, now=None):
+        """
+        Schedule rows still held by claim for another attempt with exponential
+        backoff. Rows out of attempts are kept as dead letters. Returns how many died.
+        """
+        now = time.time() if now is None else now
+        with db.transaction(self.path) as conn:
+            dead = 0
+            for row_id in row_ids:
+                row = conn.execute(
+                    "SELECT attempts FROM notification_outbox WHERE id = ? AND claimed_by = ? AND status = ?",
+                    (row_id, claim, PENDING)
+                ).fetchone()
+                if row is None:
+                    continue  # Claimed by another sender, which reports it instead
+                attempts = row[0] + 1
+                status = DEAD if attempts >= MAX_ATTEMPTS else PENDING
+                dead += status == DEAD
+                conn.execute(
+                    "UPDATE notification_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+                    "claimed_by = NULL WHERE id = ?",
+                    (status, attempts, now + min(RETRY_BASE * 2 ** (attempts - 1), MAX_RETRY_DELAY),
+                     str(error), row_id)
+                )
+        return dead
+
+    def pending(self, due_only=False, now=None):
+        """Number of rows waiting for delivery, or only those due now."""
+        now = time.time() if now is None else now
+        if due_only:
+            row = db.fetchone(
+                "SELECT COUNT(*) FROM notification_outbox WHERE status = ? AND next_attempt_at <= ?",
+                (PENDING, now), path=self.path
+            )
+        else:
+            row = db.fetchone("SELECT COUNT(*) FROM notification_outbox WHERE status = ?", (PENDING,), path=self.path)
+        return row[0]
+
+    def prune(self, now=None):
+        """Drop delivered and dead rows older than SENT_RETENTION."""
+        now = time.time() if now is None else now
+        db.execute(
+            "DELETE FROM notification_outbox WHERE status != ? AND created_at < ?",
+            (PENDING, now - SENT_RETENTION), path=self.path
+        )
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+def get_outbox():
+    """Return the shared outbox, creating its table on first use."""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = Outbox()
+    return _outbox
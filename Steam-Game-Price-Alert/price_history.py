@@ -0,0 +1,283 @@
+import array
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only one process may write a history file
+    fcntl = None
+
+# Define constants
+HISTORY_PATH = "price_history.bin"
+HEARTBEAT_SECONDS = 24 * 3600  # Unchanged prices are still recorded once a day
+MAGIC = b"SGPH"
+VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, record size
+RECORD = struct.Struct("<IIII")  # timestamp, app_id, final cents << 8 | discount, previous record of the app
+NO_PREVIOUS = 0xFFFFFFFF
+MAX_FINAL = 0xFFFFFF  # Prices above $167,772.15 are clamped
+INDEX_HEADER = struct.Struct("<Q")  # Records covered by the index file
+INDEX_CHECKPOINT_SECONDS = 300  # The index file is rewritten at most this often; opening catches up on the rest
+
+def pack_price(final, discount):
+    """Pack a price in cents and a discount percent into one 32-bit value."""
+    return min(max(int(final), 0), MAX_FINAL) << 8 | min(max(int(discount), 0), 255)
+
+def unpack_price(packed):
+    """Return (final_cents, discount_percent) from a packed price."""
+    return packed >> 8, packed & 0xFF
+
+class PriceHistory:
+    """
+    Append-only price history in a flat binary file of fixed-size records.
+    Only price changes are stored, plus a daily heartbeat so gaps in the
+    data can be told apart from unchanged prices. Each record points to the
+    previous record of the same app, so the history of one app is read by
+    walking its chain backwards from the newest record without scanning the
+    file. The newest record of every app is kept in a small index file,
+    checkpointed every checkpoint seconds and on close(). Worker processes
+    may share one file: writes hold an exclusive flock and first catch up
+    on records other processes appended.
+    """
+
+    def __init__(self, path=HISTORY_PATH, heartbeat=HEARTBEAT_SECONDS, checkpoint=INDEX_CHECKPOINT_SECONDS):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.heartbeat = heartbeat
+        self.checkpoint = checkpoint
+        self._index_count = 0  # Records covered by the index file on disk
+        self._index_saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._map = None
+        self._mapped_size = 0
+        self.count = 0
+        self._heads = {}
+        self._file = open(path, "ab")
+        try:
+            with self._file_lock():
+                if self._size() < HEADER.size:
+                    self._file.truncate(0)
+                    self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+                    self._file.flush()
+                with open(path, "rb") as file:
+                    magic, version, record_size = HEADER.unpack(file.read(HEADER.size))
+                if magic != MAGIC or record_size != RECORD.size:
+                    raise ValueError(f"{path} is not a version {VERSION} price history file")
+                size = self._size()
+                self.count = (size - HEADER.size) // RECORD.size
+                if size != HEADER.size + self.count * RECORD.size:
+                    # A crash mid-write left a partial record; drop it
+                    self._file.truncate(HEADER.size + self.count * RECORD.size)
+                self._heads = self._load_index()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _size(self):
+        return os.fstat(self._file.fileno()).st_size
+
+    @contextmanager
+    def _file_lock(self, shared=False):
+        """Hold a flock on the history file, so processes never interleave writes or read a partial one."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Add records other processes appended since the last call. Call with the file lock held."""
+        count = (self._size() - HEADER.size) // RECORD.size
+        if count > self.count:
+            first, self.count = self.count, count
+            view = self._view()
+            for index in range(first, count):
+                self._heads[RECORD.unpack_from(view, HEADER.size + index * RECORD.size)[1]] = index
+
+    def _load_index(self):
+        """Read the newest record of every app, catching up on records the index file missed."""
+        heads = {}
+        covered = 0
+        try:
+            with open(self.index_path, "rb") as file:
+                data = file.read()
+            covered = INDEX_HEADER.unpack_from(data)[0]
+            pairs = array.array("I")
+            pairs.frombytes(data[INDEX_HEADER.size:])
+            if sys.byteorder == "big":
+                pairs.byteswap()
+            heads = dict(zip(pairs[0::2], pairs[1::2]))
+        except (OSError, struct.error, ValueError):
+            covered = 0
+        if covered > self.count:
+            heads, covered = {}, 0
+        if covered < self.count:
+            view = self._view()
+            for index in range(covered, self.count):
+                heads[RECORD.unpack_from(view, HEADER.size + index * RECORD.size)[1]] = index
+            self._heads = heads
+            self._save_index()
+        self._index_count = self.count
+        return heads
+
+    def _save_index(self):
+        pairs = array.array("I")
+        for app_id, index in self._heads.items():
+            pairs.append(app_id)
+            pairs.append(index)
+        if sys.byteorder == "big":
+            pairs.byteswap()
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(self.count))
+            file.write(pairs.tobytes())
+        os.replace(temp_path, self.index_path)
+        self._index_count = self.count
+        self._index_saved_at = time.monotonic()
+
+    def _refresh(self):
+        """Catch up on records other processes appended, for readers."""
+        if self._size() != HEADER.size + self.count * RECORD.size:
+            with self._file_lock(shared=True):
+                self._catch_up()
+
+    def _view(self):
+        """Return a read-only mmap of the file, remapped when it has grown."""
+        size = HEADER.size + self.count * RECORD.size
+        if self._map is None or self._mapped_size < size:
+            # The old map is left to the garbage collector since batch readers may still hold views of it
+            with open(self.path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = len(self._map)
+        return self._map
+
+    def _read(self, index):
+        return RECORD.unpack_from(self._view(), HEADER.size + index * RECORD.size)
+
+    def record(self, prices, timestamp=None):
+        """
+        Record the price_overview dicts of one fetch, keyed by app ID. Apps
+        without a price are skipped, and an unchanged price is only written
+        once per heartbeat. Returns the number of records appended.
+        """
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        with self._lock, self._file_lock():
+            self._catch_up()
+            chunks = []
+            for app_id, price_info in prices.items():
+                if not price_info:
+                    continue
+                app_id = int(app_id)
+                packed = pack_price(price_info["final"], price_info["discount_percent"])
+                head = self._heads.get(app_id)
+                if head is not None:
+                    last_timestamp, _, last_packed, _ = self._read(head)
+                    if last_packed == packed and timestamp - last_timestamp < self.heartbeat:
+                        continue
+                index = self.count + len(chunks)
+                chunks.append(RECORD.pack(timestamp, app_id, packed, NO_PREVIOUS if head is None else head))
+                self._heads[app_id] = index
+            if chunks:
+                self._file.write(b"".join(chunks))
+                self._file.flush()
+                self.count += len(chunks)
+                if time.monotonic() - self._index_saved_at >= self.checkpoint:
+                    self._save_index()
+            return len(chunks)
+
+    def samples(self, app_id, start=None, end=None):
+        """Return the (timestamp, final_cents, discount_percent) records of one app between start and end, oldest first."""
+        start = 0 if start is None else start
+        end = float("inf") if end is None else end
+        samples = []
+        with self._lock:
+            self._refresh()
+            index = self._heads.get(int(app_id), NO_PREVIOUS)
+            while index != NO_PREVIOUS:
+                timestamp, _, packed, previous = self._read(index)
+                if timestamp < start:
+                    break
+                if timestamp <= end:
+                    samples.append((timestamp,) + unpack_price(packed))
+                index = previous
+        samples.reverse()
+        return samples
+
+    def latest(self, app_id):
+        """Return the newest (timestamp, final_cents, discount_percent) of one app, or None."""
+        with self._lock:
+            self._refresh()
+            index = self._heads.get(int(app_id))
+            if index is None:
+                return None
+            timestamp, _, packed, _ = self._read(index)
+        return (timestamp,) + unpack_price(packed)
+
+    def app_ids(self):
+        """Every app ID with at least one record."""
+        with self._lock:
+            self._refresh()
+            return list(self._heads)
+
+    def records_buffer(self):
+        """
+        Zero-copy view of every record as little-endian uint32 quadruples
+        (timestamp, app_id, packed price, previous), for batch readers.
+        """
+        with self._lock:
+            self._refresh()
+            view = memoryview(self._view())
+            return view[HEADER.size:HEADER.size + self.count * RECORD.size]
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._index_count != self.count:
+                with self._file_lock():
+                    self._catch_up()
+                    self._save_index()
+            self._file.close()
+            if self._map is not None:
+                try:
+                    self._map.close()
+                except BufferError:
+                    pass  # Still viewed by a batch reader
+                self._map = None
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_history():
+    """Return the shared price history, opening it on first use."""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = PriceHistory()
+    return _history
+
+def close_history():
+    """Close the shared history, writing out its index, if it was opened."""
+    global _history
+    with _history_lock:
+        if _history is not None:
+            _history.close()
+            _history = None
+
+def record_prices(prices, timestamp=None):
+    """Record one fetch in the shared history. A failing disk never stops a scan."""
+    try:
+        return get_history().record(prices, timestamp)
+    except (OSError, ValueError) as e:
+        logging.error(f"Error recording price history: {e}")
+        return 0
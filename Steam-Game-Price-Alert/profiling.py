@@ -0,0 +1,180 @@
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+import metrics
+
+# Define constants
+STAGES = ("fetch", "parse", "evaluate", "notify")
+TOP_ENTRIES = 30  # Rows in each hot-function and allocation table
+TRACEMALLOC_FRAMES = 10
+# Before 3.12 cProfile only sees the thread that enabled it. From 3.12 it runs on
+# sys.monitoring, which covers every thread and allows a single active profiler.
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+
+_stage_lock = threading.Lock()
+_stage_totals = {}
+_last_stages = {}
+_profile_lock = threading.Lock()
+_profiled_cycle = 0  # Nonzero while a CycleProfiler cycle is running
+_cycle_counter = 0
+_thread_profiles = threading.local()
+_worker_profilers = []  # Per-thread profilers of the running cycle, merged into its report
+
+@contextmanager
+def span(stage):
+    """
+    Add the time spent in the enclosed block to the current cycle's total for
+    stage. Spans may run on worker threads and may nest: fetch includes parse.
+    Pipeline stages overlap, so stage totals can add up to more than the cycle.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stage_lock:
+            _stage_totals[stage] = _stage_totals.get(stage, 0.0) + elapsed
+
+def reset_stages():
+    """Start timing a new cycle."""
+    with _stage_lock:
+        _stage_totals.clear()
+
+def collect_stages():
+    """Finish the current cycle: record its stage totals as metrics and return them."""
+    global _last_stages
+    with _stage_lock:
+        stages = dict(_stage_totals)
+        _stage_totals.clear()
+    for stage, elapsed in stages.items():
+        metrics.observe("scan_stage_seconds", elapsed, stage=stage)
+    _last_stages = stages
+    return stages
+
+def last_stages():
+    """Stage totals of the most recently completed cycle."""
+    return dict(_last_stages)
+
+def format_stages(stages):
+    """Render stage totals as key=value pairs in stage order, e.g. 'fetch=1.204 parse=0.031'."""
+    return " ".join(f"{stage}={stages[stage]:.3f}" for stage in STAGES if stage in stages)
+
+def call_profiled(func, *args):
+    """
+    Call func(*args) on a worker thread. While a cycle is being profiled on
+    Python < 3.12 the call runs under a profiler of its own thread, since
+    cProfile only sees the thread that enabled it; the cycle report merges
+    them all. Newer versions profile every thread with the cycle's profiler.
+    """
+    cycle = _profiled_cycle
+    if not cycle or not PER_THREAD_PROFILERS:
+        return func(*args)
+    if getattr(_thread_profiles, "cycle", None) != cycle:
+        import cProfile
+
+        _thread_profiles.cycle = cycle
+        _thread_profiles.profiler = cProfile.Profile()
+        with _profile_lock:
+            _worker_profilers.append(_thread_profiles.profiler)
+    profiler = _thread_profiles.profiler
+    profiler.enable()
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+
+class CycleProfiler:
+    """
+    Profile the next few scan cycles with cProfile and tracemalloc. Each
+    profiled cycle writes a text report (stage spans, hot functions, top
+    allocations) and the raw .prof file to output_dir; later cycles run
+    without any profiling overhead. Work the pipeline runs through
+    call_profiled on its worker threads is included. Allocations are traced
+    in every thread.
+    """
+
+    def __init__(self, output_dir, cycles=1, top=TOP_ENTRIES):
+        self.output_dir = output_dir
+        self.remaining = cycles
+        self.top = top
+        self.profiled = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def cycle(self):
+        """Wrap one scan cycle, profiling it while profiled cycles remain."""
+        if self.remaining <= 0:
+            yield
+            return
+        global _profiled_cycle, _cycle_counter
+        import cProfile  # Only paid for when profiling is on
+        import tracemalloc
+
+        self.remaining -= 1
+        self.profiled += 1
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        profiler = cProfile.Profile()
+        with _profile_lock:
+            _cycle_counter += 1
+            _profiled_cycle = _cycle_counter
+            _worker_profilers.clear()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with _profile_lock:
+                _profiled_cycle = 0
+                workers = list(_worker_profilers)
+                _worker_profilers.clear()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+            self._write_report(profiler, workers, snapshot, elapsed, peak)
+
+    def _write_report(self, profiler, workers, snapshot, elapsed, peak):
+        import io
+        import pstats
+        import tracemalloc
+
+        name = f"cycle-{self.profiled:03d}-{time.strftime('%Y%m%d-%H%M%S')}"
+        report = io.StringIO()
+        # pstats refuses a profiler that recorded nothing, e.g. a worker thread that got no work
+        profilers = [p for p in (profiler, *workers) if p.getstats()]
+        stats = pstats.Stats(*profilers, stream=report) if profilers else None
+        if stats:
+            stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+
+        report.write(f"Cycle {self.profiled}: {elapsed:.3f}s, peak traced memory {peak / 1024:.1f} KiB\n")
+        report.write(f"Stages (seconds): {format_stages(last_stages()) or 'none recorded'}\n")
+        if PER_THREAD_PROFILERS:
+            report.write(f"Profiled threads: {len(workers) + 1} (the cycle's own and {len(workers)} workers)\n")
+        else:
+            report.write("Profiled threads: all\n")
+        if stats:
+            stats.strip_dirs()
+            for sort_key in ("cumulative", "tottime"):
+                report.write(f"\n=== Hot functions by {sort_key} ===\n")
+                stats.sort_stats(sort_key).print_stats(self.top)
+        else:
+            report.write("\nNo calls were profiled.\n")
+        report.write("\n=== Top allocations by line ===\n")
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ))
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            report.write(f"{stat}\n")
+
+        path = os.path.join(self.output_dir, f"{name}.txt")
+        with open(path, "w") as file:
+            file.write(report.getvalue())
+        logging.info(f"event=profile_written path={path}")
@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+import db
+
+# Define constants
+CACHE_DB_PATH = "response_cache.db"
+DEFAULT_TTL = 6 * 3600  # 6 hours
+MAX_ENTRIES = 5000
+TOUCH_FLUSH_SIZE = 256  # Hits whose recency is written back to disk in one batch
+
+class ResponseCache:
+    """
+    LRU cache of Steam API responses keyed by (app_id, country_code, language).
+    Entries live in memory and in an SQLite file so they survive restarts.
+    """
+
+    def __init__(self, path=CACHE_DB_PATH, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._touched = {}  # key -> last hit time not yet written to disk
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self.path = path
+        self._conn().execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                app_id TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                language TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (app_id, country_code, language)
+            )
+        ''')
+        self._conn().execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+
+    def _conn(self):
+        return db.get_connection(self.path)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                row = self._conn().execute(
+                    "SELECT expires_at, payload FROM responses WHERE app_id = ? AND country_code = ? AND language = ?",
+                    key
+                ).fetchone()
+                if row:
+                    entry = (row[0], json.loads(row[1]))
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                self._entries.pop(key, None)
+                self._touched.pop(key, None)
+                self._conn().execute(
+                    "DELETE FROM responses WHERE app_id = ? AND country_code = ? AND language = ?", key
+                )
+                return None
+
+            self._stats["hits"] += 1
+            self._remember(key, entry)
+            # Hits stay reads; their recency is written back in batches
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                with db.transaction(self.path) as conn:
+                    self._flush_touched(conn)
+            return value
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        """Store value under key for ttl seconds."""
+        now = time.time()
+        entry = (now + ttl, value)
+        with self._lock:
+            self._remember(key, entry)
+            with db.transaction(self.path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, json.dumps(value), entry[0], now)
+                )
+                self._touched.pop(key, None)
+                self._flush_touched(conn)
+                # Drop the least recently used rows beyond the size limit
+                cursor = conn.execute(
+                    "DELETE FROM responses WHERE rowid IN "
+                    "(SELECT rowid FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._stats["evictions"] += max(cursor.rowcount, 0)
+
+    def _flush_touched(self, conn):
+        """Write pending hit times to disk inside the caller's transaction."""
+        if self._touched:
+            conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE app_id = ? AND country_code = ? AND language = ?",
+                [(touched_at, *key) for key, touched_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def flush(self):
+        """Persist the recency of recent hits, e.g. before shutting down."""
+        with self._lock:
+            with db.transaction(self.path) as conn:
+                self._flush_touched(conn)
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every cached entry from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            self._conn().execute("DELETE FROM responses")
+
+    def stats(self):
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared response cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+def get_cache_stats():
+    """Return hit/miss statistics of the shared response cache."""
+    return get_cache().stats()
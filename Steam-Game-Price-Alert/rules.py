@@ -0,0 +1,131 @@
+import functools
+import logging
+import operator
+import re
+
+# Define constants
+THRESHOLD_RULE = "price <= threshold"  # Default rule of the price target mode
+SALE_RULE = "discount > 0"  # Default rule of the sale mode
+SHORTHANDS = {
+    "threshold": THRESHOLD_RULE,
+    "sale": SALE_RULE,
+    "low": "low <= 0"
+}
+OPERATORS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq
+}
+CONDITION_PATTERN = re.compile(r"^(price|discount|low)\s*(<=|>=|<|>|=)\s*(threshold|\d+(?:\.\d+)?)$")
+
+class Rule:
+    """
+    A compiled alert rule: any of its groups must match, and a group matches
+    when all of its conditions do. Conditions compare a game's price (in
+    dollars), discount (in percent) or distance above its all-time low (in
+    percent) to a number, or the price to the game's own threshold.
+    """
+
+    def __init__(self, spec, groups):
+        self.spec = spec
+        self.groups = groups  # ((field, compare, value), ...) per group, value None means the threshold
+        self.needs_history = any(field == "low" for group in groups for field, _, _ in group)
+
+    def matches(self, price, discount, threshold=None, above_low=None):
+        """Whether a price matches. threshold and above_low are None when unknown, which fails their conditions."""
+        values = {"price": price, "discount": discount, "low": above_low}
+        for group in self.groups:
+            for field, compare, value in group:
+                if value is None:
+                    value = threshold
+                actual = values[field]
+                if actual is None or value is None or not compare(actual, value):
+                    break
+            else:
+                return True
+        return False
+
+    def __repr__(self):
+        return f"Rule({self.spec!r})"
+
+@functools.lru_cache(maxsize=1024)
+def compile_rule(spec):
+    """
+    Compile a rule like "price <= 19.99 and discount >= 50 or low <= 5".
+    "and" binds tighter than "or". The words threshold, sale and low on their
+    own stand for "price <= threshold", "discount > 0" and "low <= 0".
+    Raises ValueError for a rule that cannot be parsed.
+    """
+    groups = []
+    for group_text in re.split(r"\s+or\s+", spec.strip().lower()):
+        group = []
+        for condition in re.split(r"\s+and\s+", group_text.strip()):
+            condition = SHORTHANDS.get(condition.strip(), condition.strip())
+            match = CONDITION_PATTERN.match(condition)
+            if not match:
+                raise ValueError(f"Invalid rule condition: {condition!r}")
+            field, op, value = match.groups()
+            if value == "threshold" and field != "price":
+                raise ValueError(f"Only price can be compared to the threshold: {condition!r}")
+            group.append((field, OPERATORS[op], None if value == "threshold" else float(value)))
+        groups.append(tuple(group))
+    return Rule(spec.strip(), tuple(groups))
+
+def prepare(games, custom_rules, fallback):
+    """
+    Compile the rule of every game once per cycle. games holds (id,
+    game_name, app_id, price_threshold) rows and custom_rules maps app IDs
+    to rule specs; other games use the fallback rule. History lows are
+    computed in one batch, only for games whose rule needs them.
+    Returns (rules, lows) for evaluate_prices; lows is None when NumPy is
+    missing, and then 'low' conditions never match.
+    """
+    rules = {}
+    for _, _, app_id, _ in games:
+        spec = custom_rules.get(app_id)
+        if spec is None:
+            rules[app_id] = fallback
+            continue
+        try:
+            rules[app_id] = compile_rule(spec)
+        except ValueError as e:
+            logging.error(f"Ignoring the rule of app {app_id}, using the default: {e}")
+            rules[app_id] = fallback
+
+    lows = {}
+    history_ids = [app_id for app_id, rule in rules.items() if rule.needs_history]
+    if history_ids:
+        try:
+            import analytics
+            lows = analytics.summarize(history_ids)
+        except ImportError:
+            logging.error("Rules that use 'low' need NumPy (pip install numpy); they will not match.")
+            lows = None
+    return rules, lows
+
+def evaluate_prices(games, prices, rules, lows):
+    """
+    Evaluate prepared rules (see prepare) against fetched prices, for any
+    subset of the prepared games. Returns {app_id: (rule, matched)} for
+    every game with a price.
+    """
+    outcome = {}
+    for _, _, app_id, threshold in games:
+        price_info = prices.get(app_id)
+        if not price_info:
+            continue
+        rule = rules[app_id]
+        above_low = None
+        if lows is not None:
+            stats = lows.get(app_id)
+            # The lows predate this price, which may itself be a new low; with no history it is the low
+            low = price_info['final'] if stats is None else min(stats["all_time_low"], price_info['final'])
+            if low:
+                above_low = (price_info['final'] / low - 1) * 100
+            else:
+                above_low = 0.0 if price_info['final'] == 0 else None
+        outcome[app_id] = (rule, rule.matches(price_info['final'] / 100, price_info['discount_percent'],
+                                              threshold, above_low))
+    return outcome
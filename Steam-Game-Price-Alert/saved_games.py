@@ -1,74 +1,175 @@
+import logging
+import re
 import sqlite3
+import time
+import db
+
+def parse_app_id(game_link):
+    """Return the integer Steam app ID from a store link, or None if there is none."""
+    match = re.search(r'/app/(\d+)', game_link or "")
+    return int(match.group(1)) if match else None
+
+def resolve_app_id(game):
+    """Turn a Steam store link or a bare app ID into an integer app ID, or None."""
+    game = game.strip()
+    return int(game) if game.isdigit() else parse_app_id(game)
+
+def _column_names(table):
+    return {row[1] for row in db.fetchall(f"PRAGMA table_info({table})")}
+
+def _migrate_app_id():
+    """Add the integer app_id column and backfill it from game_link."""
+    with db.transaction() as conn:
+        conn.execute("ALTER TABLE games ADD COLUMN app_id INTEGER")
+        kept = {}  # app_id -> id of the oldest row
+        for game_id, game_name, game_link, threshold in conn.execute(
+            "SELECT id, game_name, game_link, price_threshold FROM games ORDER BY id"
+        ).fetchall():
+            app_id = parse_app_id(game_link)
+            if app_id is None:
+                logging.warning(f"Could not find an app ID in link '{game_link}' (game ID {game_id})")
+                continue
+            if app_id in kept:
+                # The unique index allows one row per app; later duplicates keep their data but are not scanned
+                logging.warning(
+                    f"Game ID {game_id} ('{game_name}', threshold {threshold}) duplicates app {app_id} "
+                    f"of game ID {kept[app_id]}; it is kept without an app ID and will not be scanned. "
+                    f"Remove it from the menu once its threshold is copied over."
+                )
+                continue
+            kept[app_id] = game_id
+            conn.execute("UPDATE games SET app_id = ? WHERE id = ?", (app_id, game_id))
+    logging.info(f"Backfilled app IDs for {len(kept)} games")
 
 def initialize_database():
     """Initialize the SQLite database for storing games and price thresholds."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute('''
+    db.execute('''
         CREATE TABLE IF NOT EXISTS games (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             game_name TEXT NOT NULL,
             game_link TEXT NOT NULL,
-            price_threshold REAL
+            price_threshold REAL,
+            app_id INTEGER,
+            scan_interval INTEGER,
+            alert_rule TEXT,
+            header_image TEXT,
+            metadata_updated_at REAL
         )
     ''')
-    conn.commit()
-    conn.close()
-
-def add_game(game_name, game_link):
-    """Add a new game to the database."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO games (game_name, game_link) VALUES (?, ?)", (game_name, game_link))
-    conn.commit()
-    conn.close()
+    columns = _column_names("games")
+    if "app_id" not in columns:
+        _migrate_app_id()
+    if "scan_interval" not in columns:
+        db.execute("ALTER TABLE games ADD COLUMN scan_interval INTEGER")
+    if "alert_rule" not in columns:
+        db.execute("ALTER TABLE games ADD COLUMN alert_rule TEXT")
+    if "header_image" not in columns:
+        db.execute("ALTER TABLE games ADD COLUMN header_image TEXT")
+        db.execute("ALTER TABLE games ADD COLUMN metadata_updated_at REAL")
+    duplicates = db.fetchall("SELECT app_id FROM games WHERE app_id IS NOT NULL GROUP BY app_id HAVING COUNT(*) > 1")
+    if duplicates:
+        logging.error(
+            f"Not adding the unique app_id index: apps {', '.join(str(row[0]) for row in duplicates)} "
+            f"are saved more than once"
+        )
+    else:
+        db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_games_app_id ON games (app_id)")
+
+def add_game(game_name, game_link, header_image=None):
+    """Add a new game to the database. Returns False if the game is already saved."""
+    try:
+        db.execute(
+            "INSERT INTO games (game_name, game_link, app_id, header_image, metadata_updated_at) VALUES (?, ?, ?, ?, ?)",
+            (game_name, game_link, parse_app_id(game_link), header_image, time.time() if header_image else None)
+        )
+    except sqlite3.IntegrityError:
+        print(f"Game '{game_name}' is already in your saved games.")
+        return False
     print(f"Game '{game_name}' added successfully.")
+    return True
+
+def add_games(games):
+    """
+    Add many (game_name, game_link, app_id, header_image) rows in one transaction.
+    Games that are already saved are skipped. Returns how many were added.
+    """
+    now = time.time()
+    with db.transaction() as conn:
+        cursor = conn.executemany(
+            "INSERT OR IGNORE INTO games (game_name, game_link, app_id, header_image, metadata_updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(name, link, app_id, image, now if image else None) for name, link, app_id, image in games]
+        )
+    return cursor.rowcount
+
+def get_saved_app_ids():
+    """Return the set of app IDs already in the database."""
+    return {row[0] for row in db.fetchall("SELECT app_id FROM games WHERE app_id IS NOT NULL")}
 
 def get_all_games():
     """Retrieve all games from the database."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, game_name FROM games")
-    games = cursor.fetchall()
-    conn.close()
-    return games
+    return db.fetchall("SELECT id, game_name FROM games")
+
+def get_watchlist():
+    """Return (id, game_name, app_id, price_threshold) for every scannable game in one query."""
+    return db.fetchall(
+        "SELECT id, game_name, app_id, price_threshold FROM games WHERE app_id IS NOT NULL ORDER BY id"
+    )
+
+def find_game_id(app_id):
+    """Return the row ID of the saved game with this Steam app ID, or None."""
+    row = db.fetchone("SELECT id FROM games WHERE app_id = ?", (int(app_id),))
+    return row[0] if row else None
 
 def get_game_link(game_id):
     """Get the game link for a specific game ID."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT game_link FROM games WHERE id = ?", (game_id,))
-    game_link = cursor.fetchone()
-    conn.close()
+    game_link = db.fetchone("SELECT game_link FROM games WHERE id = ?", (game_id,))
     return game_link[0] if game_link else None
 
 def remove_game(game_id):
     """Remove a game from the database by its ID."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM games WHERE id = ?", (game_id,))
-    conn.commit()
-    conn.close()
+    db.execute("DELETE FROM games WHERE id = ?", (game_id,))
     print(f"Game with ID {game_id} has been removed from the database.")
 
 def save_price_threshold(game_id, threshold):
     """Save the price threshold for a game in the database."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("UPDATE games SET price_threshold = ? WHERE id = ?", (threshold, game_id))
-    conn.commit()
-    conn.close()
+    db.execute("UPDATE games SET price_threshold = ? WHERE id = ?", (threshold, game_id))
     print(f"Price threshold for game ID {game_id} set to {threshold}.")
 
 def get_price_threshold(game_id):
     """Retrieve the price threshold for a game from the database."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT price_threshold FROM games WHERE id = ?", (game_id,))
-    threshold = cursor.fetchone()
-    conn.close()
+    threshold = db.fetchone("SELECT price_threshold FROM games WHERE id = ?", (game_id,))
     return threshold[0] if threshold else None
 
+def save_scan_interval(game_id, seconds):
+    """Save how often a game is checked, in seconds. None restores the default interval."""
+    db.execute("UPDATE games SET scan_interval = ? WHERE id = ?", (seconds, game_id))
+    print(f"Scan interval for game ID {game_id} set to {seconds}.")
+
+def get_scan_intervals():
+    """Return {app_id: scan_interval} for every game with a custom interval."""
+    return dict(db.fetchall("SELECT app_id, scan_interval FROM games WHERE scan_interval IS NOT NULL AND app_id IS NOT NULL"))
+
+def save_alert_rule(game_id, rule):
+    """Save the alert rule of a game (see rules.compile_rule). None restores the default rule."""
+    db.execute("UPDATE games SET alert_rule = ? WHERE id = ?", (rule, game_id))
+    print(f"Alert rule for game ID {game_id} set to {rule or 'the default'}.")
+
+def get_alert_rules():
+    """Return {app_id: alert_rule} for every game with its own rule."""
+    return dict(db.fetchall("SELECT app_id, alert_rule FROM games WHERE alert_rule IS NOT NULL AND app_id IS NOT NULL"))
+
+def get_game_metadata(app_id):
+    """Return the stored (game_name, header_image, metadata_updated_at) of an app, or None."""
+    return db.fetchone("SELECT game_name, header_image, metadata_updated_at FROM games WHERE app_id = ?", (int(app_id),))
+
+def save_game_metadata(app_id, game_name, header_image):
+    """Store the static store metadata of an app, stamped with the current time."""
+    db.execute(
+        "UPDATE games SET game_name = ?, header_image = ?, metadata_updated_at = ? WHERE app_id = ?",
+        (game_name, header_image, time.time(), int(app_id))
+    )
+
 # This allows testing this module independently
 if __name__ == "__main__":
     initialize_database()
@@ -79,4 +180,4 @@ if __name__ == "__main__":
     # threshold = get_price_threshold(1)
     # print(f"Price threshold for game ID 1: {threshold}")
     # games = get_all_games()
-    # print(f"Games in database: {games}")
\ No newline at end of file
+    # print(f"Games in database: {games}")
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import http_client
+import metrics
+import profiling
+import scanner
+
+# Define constants
+DEFAULT_CONCURRENCY = 8  # Max Steam requests in flight at once, keep <= http_client.POOL_SIZE
+EVALUATE_CONCURRENCY = 1  # Evaluator workers in a scan pipeline
+NOTIFY_CONCURRENCY = 1  # Notifier workers in a scan pipeline
+EVALUATE_QUEUE_SIZE = 4  # Fetched batches waiting for an evaluator before fetchers block
+NOTIFY_QUEUE_SIZE = 500  # Notifications waiting for a notifier before evaluators block
+STAGES = ("fetch", "evaluate", "notify")
+
+_pipeline_settings = {
+    "fetch_concurrency": DEFAULT_CONCURRENCY,
+    "evaluate_concurrency": EVALUATE_CONCURRENCY,
+    "notify_concurrency": NOTIFY_CONCURRENCY,
+    "evaluate_queue_size": EVALUATE_QUEUE_SIZE,
+    "notify_queue_size": NOTIFY_QUEUE_SIZE
+}
+_executors = {}  # Stage name -> (workers, pool), kept across cycles so worker threads keep their SQLite connections
+_executor_lock = threading.Lock()
+
+def configure(**settings):
+    """Change the worker counts or queue sizes used by run_pipeline (see _pipeline_settings)."""
+    unknown = set(settings) - set(_pipeline_settings)
+    if unknown:
+        raise TypeError(f"Unknown pipeline settings: {', '.join(sorted(unknown))}")
+    _pipeline_settings.update({name: value for name, value in settings.items() if value is not None})
+
+def resolve_details(app_ids, country_code, language, concurrency=DEFAULT_CONCURRENCY, on_done=None):
+    """
+    Fetch full app details (name, header image...) for many apps on
+    concurrency threads, bounded by the session timeouts. on_done(app_id,
+    details) is called as each one finishes. Returns {app_id: details or None}.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    details = {}
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="resolve")
+    try:
+        futures = {
+            executor.submit(scanner.get_game_details, app_id, country_code, language): app_id
+            for app_id in dict.fromkeys(app_ids)
+        }
+        for future in as_completed(futures):
+            app_id = futures[future]
+            details[app_id] = future.result()
+            if on_done:
+                on_done(app_id, details[app_id])
+    finally:
+        executor.shutdown(cancel_futures=True)  # On Ctrl-C, drop the lookups that have not started
+    return details
+
+class _QueueDepth:
+    """Track the current and deepest size of a pipeline queue as gauges."""
+
+    def __init__(self, name, queue):
+        self.name = name
+        self.queue = queue
+        self.max_depth = 0
+
+    async def put(self, item):
+        await self.queue.put(item)
+        depth = self.queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        metrics.set_gauge("pipeline_queue_depth", depth, queue=self.name)
+
+    async def get(self):
+        item = await self.queue.get()
+        metrics.set_gauge("pipeline_queue_depth", self.queue.qsize(), queue=self.name)
+        return item
+
+def _stage_executor(stage, workers):
+    """
+    Return the long-lived pool of one pipeline stage, so every stage always
+    has its threads. The pool is replaced if configure() changed its size.
+    """
+    with _executor_lock:
+        size, executor = _executors.get(stage, (None, None))
+        if size != workers:
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"scan-{stage}")
+            _executors[stage] = (workers, executor)
+        return executor
+
+def shutdown():
+    """Stop the stage pools; the next run_pipeline starts new ones."""
+    with _executor_lock:
+        for _, executor in _executors.values():
+            executor.shutdown(wait=True)
+        _executors.clear()
+
+async def _pipeline(games, country_code, language, evaluate_batch, notify, settings, executors):
+    loop = asyncio.get_running_loop()
+    batches = iter(scanner.chunk_app_ids(list(games), scanner.PRICE_BATCH_SIZE))
+    evaluate_queue = _QueueDepth("evaluate", asyncio.Queue(settings["evaluate_queue_size"]))
+    notify_queue = _QueueDepth("notify", asyncio.Queue(settings["notify_queue_size"]))
+
+    async def fetcher():
+        for batch in batches:  # Workers share the iterator, each batch is fetched once
+            app_ids = [game[2] for game in batch]
+            # A worker thread cannot be cancelled, so the session's connect/read timeouts bound each request
+            with profiling.span("fetch"):
+                prices = await loop.run_in_executor(
+                    executors["fetch"], profiling.call_profiled, scanner.fetch_price_batch, app_ids, country_code, language
+                )
+            await evaluate_queue.put((batch, prices))  # Blocks while evaluators are behind
+
+    async def evaluator():
+        while (item := await evaluate_queue.get()) is not None:
+            notifications = await loop.run_in_executor(
+                executors["evaluate"], profiling.call_profiled, evaluate_batch, *item
+            )
+            for notification in notifications:
+                await notify_queue.put(notification)  # Blocks while notifiers are behind
+
+    async def notifier():
+        while (notification := await notify_queue.get()) is not None:
+            await loop.run_in_executor(executors["notify"], profiling.call_profiled, notify, notification)
+
+    stages = [
+        [asyncio.create_task(fetcher()) for _ in range(settings["fetch_concurrency"])],
+        [asyncio.create_task(evaluator()) for _ in range(settings["evaluate_concurrency"])],
+        [asyncio.create_task(notifier()) for _ in range(settings["notify_concurrency"])]
+    ]
+    queues = [evaluate_queue, notify_queue]
+    try:
+        # Shut the stages down in order: when one is done, tell each worker of the next to stop
+        for index, workers in enumerate(stages):
+            await asyncio.gather(*workers)
+            if index < len(queues):
+                for _ in stages[index + 1]:
+                    await queues[index].put(None)
+    except BaseException:
+        for workers in stages:
+            for task in workers:
+                task.cancel()
+        raise
+    return {queue.name: queue.max_depth for queue in queues}
+
+def run_pipeline(games, country_code, language, evaluate_batch, notify):
+    """
+    Run one scan cycle as a pipeline of fetcher workers, evaluators and
+    notifiers connected by bounded queues, so slow notifications or state
+    writes never hold up Steam requests until the queues fill.
+    games are watchlist rows with the app ID third. evaluate_batch(games,
+    prices) runs for each fetched batch and returns the notifications to
+    hand to notify(notification). Worker counts and queue sizes come from
+    configure(). Returns the elapsed seconds.
+    """
+    settings = dict(_pipeline_settings)
+    executors = {stage: _stage_executor(stage, settings[f"{stage}_concurrency"]) for stage in STAGES}
+    http_client.reset_connection_stats()
+    start = time.perf_counter()
+    max_depths = asyncio.run(_pipeline(games, country_code, language, evaluate_batch, notify, settings, executors))
+    elapsed = time.perf_counter() - start
+    for name, depth in max_depths.items():
+        metrics.set_gauge("pipeline_queue_max_depth", depth, queue=name)
+    stats = http_client.get_connection_stats()
+    logging.info(
+        f"Scan cycle processed {len(games)} games in {elapsed:.2f}s "
+        f"({stats['requests']} requests, {stats['connections_opened']} new connections, "
+        f"max queue depth evaluate={max_depths['evaluate']} notify={max_depths['notify']})"
+    )
+    return elapsed
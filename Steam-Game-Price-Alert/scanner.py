@@ -1,62 +1,388 @@
 import time
-import requests
-import json
+import threading
+import db
+import http_client
+import response_cache
 import logging
-from saved_games import get_game_link
+from contextlib import nullcontext
+import metrics
+import profiling
+import price_history
+import rules
+import shards
+import snapshot
+from saved_games import get_watchlist, get_scan_intervals, get_alert_rules, get_game_metadata, save_game_metadata
+from scheduler import ScanScheduler
 from utils import get_all_games
 from saved_info import save_user_info
 from utils import clear_screen, print_header
-from stop_spam import save_sale_reminder, is_sale_notified, remove_expired_sale
-from discord import send_discord_notification
-from saved_games import get_price_threshold
-from pyfiglet import Figlet  # For ASCII art headers
+from discord import queue_discord_notification
+from notification_state import get_state, REMINDER, SALE, RULE
 
-def extract_app_id(game_link):
-    """Extract the APP_ID from the Steam game link."""
-    try:
-        app_id = game_link.split('/app/')[1].split('/')[0]
-        return app_id
-    except Exception as e:
-        print(f"[ERROR] Invalid game link. Please provide a valid Steam store link.")
-        return None
+STEAM_APPDETAILS_URL = "https://store.steampowered.com/api/appdetails"
+PRICE_BATCH_SIZE = 100  # Max app IDs per appdetails request
+SCAN_INTERVAL = 3600  # 1 hour
+METADATA_MAX_AGE = 30 * 86400  # Names and header images are refreshed monthly
+SHARD_RETRY_SECONDS = 60  # A shard whose scan failed is claimable again after this long
+
+# Scanning modes, matching the menu choices
+MODE_THRESHOLD = "1"  # Notify when the price drops to the game's threshold
+MODE_SALE = "2"  # Notify for any discount
 
-def get_game_details(app_id, country_code, language):
-    """Fetch game details from the Steam API with error handling."""
+def get_game_details(app_id, country_code, language, use_cache=True):
+    """Fetch game details from the Steam API with error handling, served from the response cache when fresh."""
+    cache_key = (str(app_id), country_code, language)
+    if use_cache:
+        cached = response_cache.get_cache().get(cache_key)
+        if cached is not None:
+            return cached
     try:
-        response = requests.get(f'https://store.steampowered.com/api/appdetails?appids={app_id}&cc={country_code}&l={language}')
-        response.raise_for_status()
-        data = response.json()
-        return data.get(app_id, {}).get('data')
+        with metrics.track("steam_request", endpoint="details"):
+            response = http_client.get(STEAM_APPDETAILS_URL, params={"appids": app_id, "cc": country_code, "l": language})
+            response.raise_for_status()
+            data = response.json()
+        game_data = data.get(str(app_id), {}).get('data')
     except Exception as e:
         logging.error(f"Error fetching details for app {app_id}: {e}")
         return None
+    if game_data and use_cache:
+        response_cache.get_cache().set(cache_key, game_data)
+    return game_data
 
-def load_saved_sales():
-    """Load saved sale details from saved_sale.json."""
-    try:
-        with open("saved_sale.json", "r") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {}  # Return an empty dictionary if the file doesn't exist
-
-def save_sale_details(app_id, game_name, current_price, discount_percent):
-    """Save sale details to saved_sale.json."""
-    saved_sales = load_saved_sales()
-    saved_sales[app_id] = {
-        "game_name": game_name,
-        "current_price": current_price,
-        "discount_percent": discount_percent
+def get_header_image_url(app_id):
+    """Build the store header image URL for a Steam app."""
+    return f"https://cdn.akamai.steamstatic.com/steam/apps/{app_id}/header.jpg"
+
+def get_game_metadata_cached(app_id, game_name, country_code, language):
+    """
+    Return the (game_name, header_image_url) of an app from the games table.
+    The full appdetails document is only fetched when the metadata is missing
+    or older than METADATA_MAX_AGE, so scans can request prices alone.
+    """
+    row = get_game_metadata(app_id)
+    if row and row[1] and time.time() - (row[2] or 0) < METADATA_MAX_AGE:
+        return row[0], row[1]
+    game_data = get_game_details(app_id, country_code, language)
+    if not game_data:
+        return game_name, (row[1] if row and row[1] else get_header_image_url(app_id))
+    game_name = game_data.get('name') or game_name
+    header_image = game_data.get('header_image') or get_header_image_url(app_id)
+    save_game_metadata(app_id, game_name, header_image)
+    return game_name, header_image
+
+def chunk_app_ids(app_ids, batch_size=PRICE_BATCH_SIZE):
+    """Split a list of app IDs into batches small enough for one appdetails request."""
+    return [app_ids[i:i + batch_size] for i in range(0, len(app_ids), batch_size)]
+
+def fetch_price_batch(app_ids, country_code, language):
+    """Fetch the price_overview of a batch of apps with a single Steam API request."""
+    params = {
+        "appids": ",".join(str(app_id) for app_id in app_ids),
+        "cc": country_code,
+        "l": language,
+        "filters": "price_overview"
     }
-    with open("saved_sale.json", "w") as file:
-        json.dump(saved_sales, file, indent=4)
+    try:
+        with metrics.track("steam_request", endpoint="prices"):
+            response = http_client.get(STEAM_APPDETAILS_URL, params=params)
+            response.raise_for_status()
+            with profiling.span("parse"):
+                data = response.json() or {}
+    except Exception as e:
+        logging.error(f"Error fetching prices for apps {params['appids']}: {e}")
+        return {app_id: None for app_id in app_ids}
+
+    prices = {}
+    with profiling.span("parse"):
+        for app_id in app_ids:
+            entry = data.get(str(app_id)) or {}
+            details = entry.get('data') if entry.get('success') else None
+            # Free games come back with an empty list instead of a price_overview object
+            prices[app_id] = details.get('price_overview') if isinstance(details, dict) else None
+    return prices
+
+def default_rule(mode, near_low_ratio=None):
+    """
+    The rule of games without their own alert rule: the price threshold in
+    threshold mode, any discount in sale mode, optionally only within
+    near_low_ratio of the game's all-time low.
+    """
+    spec = rules.THRESHOLD_RULE if mode == MODE_THRESHOLD else rules.SALE_RULE
+    if near_low_ratio is not None:
+        if not near_low_ratio > 0:
+            raise ValueError(f"near_low_ratio must be positive, got {near_low_ratio}")
+        # Fixed-point, since rule numbers cannot be written as 1e-05
+        percent = f"{near_low_ratio * 100:.6f}".rstrip("0").rstrip(".")
+        spec = f"{spec} and low <= {percent}"
+    return rules.compile_rule(spec)
+
+def run_scan_cycle(games, mode, country_code, language, webhook_url, bot_name, bot_avatar, near_low_ratio=None,
+                   holds_lease=None):
+    """
+    Fetch, evaluate and notify once for every game in a watchlist.
+    games holds (id, game_name, app_id, price_threshold) rows from get_watchlist().
+    Games with their own alert rule are checked against it; the others
+    against the default rule of mode (see default_rule). The stages run as
+    a pipeline (see scan_engine.run_pipeline), so a slow Discord post or
+    state write does not delay the next Steam request.
+    holds_lease, if given, is called inside each notification's transaction;
+    when it returns False another worker has taken the games over, and the
+    notification is left to it. A batch or notification that raises is
+    logged and its games get the status "failed", so one error never
+    cancels the rest of the cycle.
+    Returns a (results, elapsed_seconds) tuple with one result dict per game.
+    """
+    import scan_engine  # Imported on first scan to keep asyncio out of startup
+
+    cycle_start = time.perf_counter()
+    profiling.reset_stages()
+    state = get_state()
+    mode_kind = REMINDER if mode == MODE_THRESHOLD else SALE
+    custom_rules = get_alert_rules()
+    with profiling.span("evaluate"):
+        compiled, lows = rules.prepare(games, custom_rules, default_rule(mode, near_low_ratio))
+    results = {}
+    latest = {}  # Snapshot entries of the cycle, published together once it is done
+
+    def new_result(game_id, game_name, app_id, threshold, status=None):
+        result = results[game_id] = {
+            "game_id": game_id,
+            "game_name": game_name,
+            "app_id": app_id,
+            "threshold": threshold,
+            "current_price": None,
+            "discount_percent": None,
+            "status": status
+        }
+        return result
+
+    def evaluate_batch(batch, prices):
+        try:
+            return evaluate_fetched(batch, prices)
+        except Exception as e:
+            # One bad batch must not cancel the cycle; its games are retried with backoff
+            logging.exception(f"event=evaluate_failed games={len(batch)} error=\"{e}\"")
+            for game in batch:
+                new_result(*game, status="failed")
+            return []
+
+    def evaluate_fetched(batch, prices):
+        notifications = []
+        now = time.time()
+        with profiling.span("evaluate"):
+            price_history.record_prices(prices)
+            outcome = rules.evaluate_prices(batch, prices, compiled, lows)
+            for game_id, game_name, app_id, threshold in batch:
+                result = new_result(game_id, game_name, app_id, threshold)
+                if app_id not in outcome:
+                    result["status"] = "unavailable"
+                    continue
+
+                price_info = prices[app_id]
+                result["current_price"] = price_info['final'] / 100  # Convert cents to dollars
+                result["discount_percent"] = price_info['discount_percent']
+                rule, matched = outcome[app_id]
+                result["rule"] = rule.spec
+                latest[app_id] = {
+                    "app_id": app_id,
+                    "game_name": game_name,
+                    "price": result["current_price"],
+                    "discount_percent": result["discount_percent"],
+                    "threshold": threshold,
+                    "updated_at": now
+                }
+                kind = RULE if app_id in custom_rules else mode_kind
+
+                if not matched:
+                    result["status"] = "ended" if state.clear(kind, app_id) else "no_match"
+                elif state.is_notified(kind, app_id):
+                    result["status"] = "already_notified"
+                else:
+                    result["status"] = "notified"
+                    notifications.append((kind, result))
+        return notifications
+
+    def notify(notification):
+        try:
+            send_notification(*notification)
+        except Exception as e:
+            # Nothing was recorded, so the alert is sent when the game is next scanned
+            kind, result = notification
+            logging.exception(f"event=notify_failed app_id={result['app_id']} error=\"{e}\"")
+            result["status"] = "failed"
+
+    def send_notification(kind, result):
+        with profiling.span("notify"):
+            app_id = result["app_id"]
+            game_name, image_url = get_game_metadata_cached(app_id, result["game_name"], country_code, language)
+            # The alert and its dedup record are written together, so neither can be lost without the other
+            with db.transaction():
+                if holds_lease is not None and not holds_lease():
+                    result["status"] = "lease_lost"
+                    return
+                queue_discord_notification(
+                    game_name=game_name,
+                    current_price=result["current_price"],
+                    discount_percent=result["discount_percent"],
+                    image_url=image_url,
+                    webhook_url=webhook_url,
+                    bot_name=bot_name,
+                    bot_avatar=bot_avatar,
+                    app_id=app_id,
+                    idempotency_key=f"{kind}:{app_id}:{result['current_price']:.2f}:{result['discount_percent']}"
+                )
+                state.mark(kind, app_id, result["game_name"], result["current_price"], result["discount_percent"])
+
+    elapsed = scan_engine.run_pipeline(games, country_code, language, evaluate_batch, notify)
+    snapshot.get_snapshot().update(latest)
+    profiling.collect_stages()
+    metrics.record_cycle(len(games), time.perf_counter() - cycle_start)
+    return [results[game[0]] for game in games], elapsed
+
+def run_scan_loop(load_games, mode, country_code, language, webhook_url, bot_name, bot_avatar,
+                  interval=SCAN_INTERVAL, stop_event=None, on_cycle=None, profiler=None, near_low_ratio=None,
+                  prefilter=None):
+    """
+    Scan games as the scheduler makes them due until stop_event is set.
+    interval is the default per-game interval; games with their own
+    scan_interval, games on sale and failing games are polled at other rates.
+    load_games is called on each wakeup so watchlist edits are picked up,
+    and on_cycle(results, elapsed) is called after each batch of due games.
+    A profiling.CycleProfiler passed as profiler wraps the cycles it profiles,
+    and mode and near_low_ratio pick the default rule (see run_scan_cycle).
+    With a specials.SpecialsPrefilter as prefilter, due games it skips are
+    rescheduled without a price request.
+    """
+    stop_event = stop_event or threading.Event()
+    scheduler = ScanScheduler(default_interval=interval)
+    metrics.set_gauge("scan_interval_seconds", interval)
+    while not stop_event.is_set():
+        games = load_games()
+        scheduler.sync([app_id for _, _, app_id, _ in games], get_scan_intervals())
+        snapshot.get_snapshot().retain(game[2] for game in games)
+        due = set(scheduler.pop_due())
+        due_games = [game for game in games if game[2] in due]
+        if due_games and prefilter:
+            due_games, skipped = prefilter.split(due_games, get_state().notified_app_ids())
+            for game in skipped:
+                scheduler.skip(game[2])
+        if due_games:
+            try:
+                with profiler.cycle() if profiler else nullcontext():
+                    results, elapsed = run_scan_cycle(due_games, mode, country_code, language,
+                                                      webhook_url, bot_name, bot_avatar, near_low_ratio)
+            except Exception as e:
+                # Keep the daemon alive; the games are retried with backoff like failed fetches
+                logging.exception(f"event=scan_cycle_failed games={len(due_games)} error=\"{e}\"")
+                metrics.inc("scan_cycle_errors_total")
+                results, elapsed = [], 0.0
+                for game in due_games:
+                    scheduler.record_result({"app_id": game[2], "status": "failed"})
+            for result in results:
+                scheduler.record_result(result)
+            if on_cycle:
+                on_cycle(results, elapsed)
+        wait = scheduler.seconds_until_next()
+        stop_event.wait(interval if wait is None else wait)
+
+def run_worker_loop(load_games, mode, country_code, language, webhook_url, bot_name, bot_avatar, leases,
+                    interval=SCAN_INTERVAL, stop_event=None, on_cycle=None, profiler=None, near_low_ratio=None,
+                    prefilter=None):
+    """
+    Scan the watchlist shard by shard as one of several worker processes
+    until stop_event is set. Shards are claimed through leases (a
+    shards.ShardLeases), so each shard is scanned by one worker once per
+    interval and a crashed worker's shard is picked up when its lease
+    expires. A shard whose scan raises is logged and retried after
+    SHARD_RETRY_SECONDS. Arguments are as for run_scan_loop.
+    """
+    stop_event = stop_event or threading.Event()
+    metrics.set_gauge("scan_interval_seconds", interval)
+    while not stop_event.is_set():
+        shard = leases.claim()
+        if shard is None:
+            wait = leases.seconds_until_next()
+            stop_event.wait(interval if wait is None else min(max(wait, 1), interval))
+            continue
+        next_due = None
+        results, elapsed = [], 0.0
+        heartbeat = shards.Heartbeat(leases, shard)
+        try:
+            get_state().reload()  # Pick up notifications other workers recorded
+            games = load_games()
+            snapshot.get_snapshot().retain(game[2] for game in games)
+            games = leases.select(games, shard)
+            if games and prefilter:
+                games, _ = prefilter.split(games, get_state().notified_app_ids())
+            with heartbeat, profiler.cycle() if profiler and games else nullcontext():
+                if games:
+                    results, elapsed = run_scan_cycle(
+                        games, mode, country_code, language, webhook_url, bot_name, bot_avatar, near_low_ratio,
+                        holds_lease=lambda: not heartbeat.lost and leases.holds(shard)
+                    )
+            next_due = time.time() + interval
+        except Exception as e:
+            # One failing shard must not stop the worker; the shard is retried shortly
+            logging.exception(f"event=worker_shard_failed shard={shard} error=\"{e}\"")
+            metrics.inc("worker_shard_errors_total")
+            next_due = time.time() + SHARD_RETRY_SECONDS
+            continue
+        finally:
+            # An interrupted scan leaves the shard due for the next worker
+            still_owned = leases.release(shard, next_due)
+        metrics.inc("worker_shards_scanned_total")
+        if heartbeat.lost or not still_owned:
+            logging.warning(f"Lost the lease on shard {shard} during a scan; its alerts were left to the new owner")
+        if on_cycle:
+            on_cycle(results, elapsed)
+
+def print_scan_results(results, elapsed):
+    """Print the outcome of a scan cycle for the interactive menu."""
+    print(f"\033[1;33mFetched {len(results)} games in {elapsed:.2f}s\033[0m")
+    for result in results:
+        game_name = result["game_name"]
+        if result["status"] == "failed":
+            print(f"[ERROR] Checking '{game_name}' failed; it will be retried.")
+            print("-------------------------------------------------")
+            continue
+        if result["status"] == "unavailable":
+            print(f"[ERROR] Price information not available for '{game_name}'.")
+            print("-------------------------------------------------")
+            continue
+        print(f"\033[1;36mGame: {game_name}\033[0m")
+        print(f"\033[1;32mCurrent Price: ${result['current_price']:.2f} USD\033[0m")
+        print(f"\033[1;35mDiscount: {result['discount_percent']}%\033[0m")
+        if result["status"] == "notified":
+            print(f"\033[1;31mAlert sent for '{game_name}'!\033[0m")
+        elif result["status"] == "already_notified":
+            print(f"Already notified for '{game_name}'. Skipping notification.")
+        elif result["status"] == "ended":
+            print(f"Sale has ended for '{game_name}'.")
+        print("-------------------------------------------------")
+
+def scan_selected_games(game_ids, mode, country_code, language, webhook_url, bot_name, bot_avatar):
+    """Scans the saved games with the given row IDs from the menu until Ctrl+C."""
+    clear_screen()
+    print_header("🕵️‍♂️ Scanning in Progress 🕵️‍♂️")
+    print(f"\n\033[1;32mScanning the selected games for sales every hour...\033[0m")
+    print("Press Ctrl+C to stop scanning and return to the menu.")
+    print("-------------------------------------------------")
+
+    selected_ids = set(game_ids)
+
+    def load_selected_games():
+        return [game for game in get_watchlist() if game[0] in selected_ids]
 
-def remove_expired_sale(app_id):
-    """Remove expired sale details from saved_sale.json."""
-    saved_sales = load_saved_sales()
-    if app_id in saved_sales:
-        del saved_sales[app_id]
-        with open("saved_sale.json", "w") as file:
-            json.dump(saved_sales, file, indent=4)
+    def report_cycle(results, elapsed):
+        print_scan_results(results, elapsed)
+        print("Waiting for the next scheduled check...\n")
+
+    try:
+        run_scan_loop(load_selected_games, mode, country_code, language, webhook_url,
+                      bot_name, bot_avatar, on_cycle=report_cycle)
+    except KeyboardInterrupt:
+        print("\nScanning stopped. Returning to menu...")
+        return  # Return to menu if user presses Ctrl+C
 
 def scan_for_sales(country_code, language, webhook_url, bot_name, bot_avatar):
     """Scans a single game for sales in an hourly loop."""
@@ -77,66 +403,7 @@ def scan_for_sales(country_code, language, webhook_url, bot_name, bot_avatar):
             return  # Return to menu
         elif 1 <= choice <= len(games):
             game_id, game_name = games[choice - 1]
-            game_link = get_game_link(game_id)
-            app_id = extract_app_id(game_link)
-            if app_id:
-                print(f"\n\033[1;32mInitializing scan for '{game_name}'...\033[0m")
-                print("Press Ctrl+C to stop scanning and return to the menu.")
-                print("-------------------------------------------------")
-
-                try:
-                    while True:  # Infinite loop for continuous scanning
-                        hacker_text = "Fetching game details from Steam API..."
-                        print(f"\033[1;33m{hacker_text}\033[0m")
-                        game_data = get_game_details(app_id, country_code, language)
-                        if game_data and 'price_overview' in game_data:
-                            price_info = game_data['price_overview']
-                            current_price = price_info['final'] / 100  # Convert cents to dollars
-                            discount_percent = price_info['discount_percent']
-                            image_url = game_data['header_image']
-
-                            print(f"\033[1;36mGame: {game_name}\033[0m")
-                            print(f"\033[1;32mCurrent Price: ${current_price:.2f} USD\033[0m")
-                            print(f"\033[1;35mDiscount: {discount_percent}%\033[0m")
-
-                            saved_sales = load_saved_sales()
-
-                            if discount_percent > 0:
-                                if app_id not in saved_sales:
-                                    # New sale detected
-                                    last_known_price = saved_sales.get(app_id, {}).get("current_price", "N/A")
-                                    print(f"\033[1;31mSale detected! Last known price: {last_known_price}\033[0m")
-                                    send_discord_notification(
-                                        game_name=game_name,
-                                        current_price=current_price,
-                                        discount_percent=discount_percent,
-                                        image_url=image_url,
-                                        webhook_url=webhook_url,
-                                        bot_name=bot_name,
-                                        bot_avatar=bot_avatar,
-                                        app_id=app_id
-                                    )
-                                    # Save sale details
-                                    save_sale_details(app_id, game_name, current_price, discount_percent)
-                                else:
-                                    print("Sale already notified. Skipping notification.")
-                            else:
-                                # Sale is no longer active
-                                if app_id in saved_sales:
-                                    print("Sale has ended. Removing from saved_sale.json...")
-                                    remove_expired_sale(app_id)
-                        else:
-                            print(f"[ERROR] Price information not available for '{game_name}'.")
-
-                        print("-------------------------------------------------")
-                        print("Sleeping for 1 hour before checking again...\n")
-                        time.sleep(3600)  # Wait 1 hour before checking again
-
-                except KeyboardInterrupt:
-                    print("\nScanning stopped. Returning to menu...")
-                    return  # Return to menu if user presses Ctrl+C
-            else:
-                print("[ERROR] Invalid game link.")
+            scan_selected_games([game_id], MODE_SALE, country_code, language, webhook_url, bot_name, bot_avatar)
         else:
             print("\nInvalid choice. Try again.")
     except ValueError:
@@ -180,63 +447,11 @@ def scan_multiple_games(country_code, language, webhook_url, bot_name, bot_avata
     print("\033[0;33m 1. Use price target (notify when price drops below a threshold)\033[0m")
     print("\033[0;33m 2. Detect sales normally (notify for any discount)\033[0m")
     mode_choice = input("\n\033[1;36mEnter a number (1-2): \033[0m").strip()
-
-    # Get the selected games
-    selected_games = [(games[game_id - 1][0], games[game_id - 1][1]) for game_id in game_ids]
+    if mode_choice not in (MODE_THRESHOLD, MODE_SALE):
+        print("\n\033[1;31mInvalid mode choice. Returning to menu...\033[0m")
+        input("\nPress Enter to return to the menu...")
+        return
 
     # Step 3: Start Scanning
-    clear_screen()
-    print_header("🕵️‍♂️ Scanning in Progress 🕵️‍♂️")
-    print(f"\n\033[1;32mScanning the selected games for sales every hour...\033[0m")
-    print("Press Ctrl+C to stop scanning and return to the menu.")
-    print("-------------------------------------------------")
-
-    try:
-        while True:  # Infinite loop for continuous scanning
-            for game_id, game_name in selected_games:
-                game_link = get_game_link(game_id)
-                app_id = extract_app_id(game_link)
-                if app_id:
-                    hacker_text = "Fetching game details from Steam API..."
-                    print(f"\033[1;33m{hacker_text}\033[0m")
-                    game_data = get_game_details(app_id, country_code, language)
-                    if game_data and 'price_overview' in game_data:
-                        price_info = game_data['price_overview']
-                        current_price = price_info['final'] / 100  # Convert cents to dollars
-                        discount_percent = price_info['discount_percent']
-                        image_url = game_data['header_image']
-
-                        print(f"\033[1;36mGame: {game_name}\033[0m")
-                        print(f"\033[1;32mCurrent Price: ${current_price:.2f} USD\033[0m")
-                        print(f"\033[1;35mDiscount: {discount_percent}%\033[0m")
-
-                        saved_sales = load_saved_sales()
-
-                        if discount_percent > 0:
-                            if app_id not in saved_sales:
-                                # New sale detected
-                                print(f"\033[1;31mSale detected for '{game_name}'!\033[0m")
-                                send_discord_notification(
-                                    game_name=game_name,
-                                    current_price=current_price,
-                                    discount_percent=discount_percent,
-                                    image_url=image_url,
-                                    webhook_url=webhook_url,
-                                    bot_name=bot_name,
-                                    bot_avatar=bot_avatar,
-                                    app_id=app_id
-                                )
-                                save_sale_details(app_id, game_name, current_price, discount_percent)
-                            else:
-                                print(f"Sale already notified for '{game_name}'. Skipping notification.")
-                        else:
-                            if app_id in saved_sales:
-                                remove_expired_sale(app_id)
-
-                print("-------------------------------------------------")
-            print("Sleeping for 1 hour before checking again...\n")
-            time.sleep(3600)  # Wait 1 hour before checking again
-
-    except KeyboardInterrupt:
-        print("\nScanning stopped. Returning to menu...")
-        return  # Return to menu if user presses Ctrl+C
+    scan_selected_games([games[game_id - 1][0] for game_id in game_ids], mode_choice,
+                        country_code, language, webhook_url, bot_name, bot_avatar)
@@ -0,0 +1,108 @@
+import heapq
+import random
+import time
+
+# Define constants
+DEFAULT_INTERVAL = 3600  # 1 hour between checks of a quiet game
+HOT_INTERVAL = 900  # Checks of games on sale or close to their threshold
+NEAR_THRESHOLD_RATIO = 1.1  # "Close" means within 10% above the threshold
+JITTER_RATIO = 0.1  # Randomize each interval by +/-10% so checks spread out
+ERROR_RETRY = 60  # First retry after a failed fetch, doubled on each failure
+MAX_BACKOFF = 4 * 3600
+COALESCE_WINDOW = 10  # Games due within this many seconds are fetched together
+
+class ScanScheduler:
+    """
+    Priority queue of per-game next-due times. Each game is polled at its own
+    interval, more often when a price change looks likely, and with
+    exponential backoff while its fetches keep failing.
+    """
+
+    def __init__(self, default_interval=DEFAULT_INTERVAL, hot_interval=HOT_INTERVAL,
+                 jitter_ratio=JITTER_RATIO, rng=None):
+        self.default_interval = default_interval
+        self.hot_interval = hot_interval
+        self.jitter_ratio = jitter_ratio
+        self._rng = rng or random.Random()
+        self._heap = []  # (due_at, app_id), stale entries are skipped on pop
+        self._due = {}  # app_id -> current due time
+        self._intervals = {}  # app_id -> configured interval
+        self._failures = {}  # app_id -> consecutive failed fetches
+
+    def _schedule(self, app_id, due_at):
+        self._due[app_id] = due_at
+        heapq.heappush(self._heap, (due_at, app_id))
+
+    def _jittered(self, interval):
+        return interval * self._rng.uniform(1 - self.jitter_ratio, 1 + self.jitter_ratio)
+
+    def sync(self, app_ids, intervals=None, now=None):
+        """
+        Match the schedule to the current watchlist: new games become due now,
+        removed games are dropped, and per-game intervals are refreshed.
+        """
+        now = time.time() if now is None else now
+        intervals = intervals or {}
+        current = set(app_ids)
+        for app_id in list(self._due):
+            if app_id not in current:
+                del self._due[app_id]
+                self._intervals.pop(app_id, None)
+                self._failures.pop(app_id, None)
+        for app_id in current:
+            self._intervals[app_id] = intervals.get(app_id) or self.default_interval
+            if app_id not in self._due:
+                self._schedule(app_id, now)
+
+    def pop_due(self, now=None):
+        """Remove and return the app IDs that are due, including those due within the coalesce window."""
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now + COALESCE_WINDOW:
+            due_at, app_id = heapq.heappop(self._heap)
+            if self._due.get(app_id) == due_at:
+                del self._due[app_id]
+                due.append(app_id)
+        return due
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the next game is due, or None if nothing is scheduled."""
+        now = time.time() if now is None else now
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - now, 0)
+
+    def record_result(self, result, now=None):
+        """Reschedule a game from its scan result dict (see scanner.run_scan_cycle)."""
+        now = time.time() if now is None else now
+        app_id = result["app_id"]
+        if app_id not in self._intervals:
+            return  # Removed from the watchlist while it was being scanned
+        interval = self._intervals[app_id]
+
+        if result["status"] in ("unavailable", "failed"):
+            failures = self._failures.get(app_id, 0) + 1
+            self._failures[app_id] = failures
+            delay = min(ERROR_RETRY * 2 ** (failures - 1), MAX_BACKOFF)
+            self._schedule(app_id, now + self._jittered(delay))
+            return
+
+        self._failures.pop(app_id, None)
+        if self.is_hot(result):
+            interval = min(interval, self.hot_interval)
+        self._schedule(app_id, now + self._jittered(interval))
+
+    def skip(self, app_id, now=None):
+        """Reschedule a due game that was not fetched, as if it had been checked."""
+        now = time.time() if now is None else now
+        if app_id in self._intervals:
+            self._schedule(app_id, now + self._jittered(self._intervals[app_id]))
+
+    def is_hot(self, result):
+        """Whether a game is on sale or priced close to its threshold."""
+        if result["discount_percent"]:
+            return True
+        threshold = result["threshold"]
+        return threshold is not None and result["current_price"] <= threshold * NEAR_THRESHOLD_RATIO
@@ -0,0 +1,148 @@
+import os
+import socket
+import threading
+import time
+import db
+
+# Define constants
+SHARD_COUNT = 16  # Watchlist slices that workers claim independently
+LEASE_SECONDS = 120  # A claimed shard is reclaimable this long after its last heartbeat
+HEARTBEAT_SECONDS = 30
+
+def default_worker_id():
+    """Name a worker after its host and process."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+def shard_of(app_id, shard_count=SHARD_COUNT):
+    """The shard a game belongs to."""
+    return int(app_id) % shard_count
+
+class ShardLeases:
+    """
+    Lease table in the games database through which worker processes split
+    the watchlist. Each shard is scanned by one worker at a time: a worker
+    claims a due shard, renews its lease while scanning, then releases it
+    with the time the shard is next due. A worker that stops heartbeating
+    loses its lease, and the shard is claimed again by another worker.
+    Workers must run on the database's host: WAL mode needs shared memory
+    and does not work over network filesystems.
+    """
+
+    def __init__(self, worker_id=None, shard_count=SHARD_COUNT, lease_seconds=LEASE_SECONDS, path=db.DB_PATH):
+        self.worker_id = worker_id or default_worker_id()
+        self.shard_count = shard_count
+        self.lease_seconds = lease_seconds
+        self.path = path
+        with db.transaction(path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scan_leases (
+                    shard INTEGER PRIMARY KEY,
+                    owner TEXT,
+                    lease_expires REAL NOT NULL DEFAULT 0,
+                    next_due REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            count, live = conn.execute(
+                "SELECT COUNT(*), SUM(owner IS NOT NULL AND lease_expires >= ?) FROM scan_leases", (time.time(),)
+            ).fetchone()
+            if count != shard_count:
+                if live:
+                    raise ValueError(f"Running workers use {count} shards; start this worker with the same count")
+                # A different shard count maps games differently, so start every shard afresh
+                conn.execute("DELETE FROM scan_leases")
+                conn.executemany("INSERT INTO scan_leases (shard) VALUES (?)", [(shard,) for shard in range(shard_count)])
+
+    def claim(self, now=None):
+        """Lease the most overdue shard that is free or expired. Returns the shard number, or None."""
+        now = time.time() if now is None else now
+        with db.transaction(self.path) as conn:
+            row = conn.execute(
+                "SELECT shard FROM scan_leases WHERE next_due <= ? AND (owner IS NULL OR lease_expires < ? OR owner = ?) "
+                "ORDER BY next_due LIMIT 1",
+                (now, now, self.worker_id)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE scan_leases SET owner = ?, lease_expires = ? WHERE shard = ?",
+                (self.worker_id, now + self.lease_seconds, row[0])
+            )
+        return row[0]
+
+    def heartbeat(self, shard, now=None):
+        """Extend the lease on a shard. Returns False if another worker has taken it over."""
+        now = time.time() if now is None else now
+        cursor = db.execute(
+            "UPDATE scan_leases SET lease_expires = ? WHERE shard = ? AND owner = ?",
+            (now + self.lease_seconds, shard, self.worker_id),
+            path=self.path
+        )
+        return cursor.rowcount == 1
+
+    def holds(self, shard):
+        """
+        Whether this worker still owns the lease on a shard. Called inside a
+        db.transaction(), the answer holds until it commits, since claims
+        are made in transactions too.
+        """
+        row = db.fetchone(
+            "SELECT 1 FROM scan_leases WHERE shard = ? AND owner = ?", (shard, self.worker_id), path=self.path
+        )
+        return row is not None
+
+    def release(self, shard, next_due=None):
+        """
+        Give up the lease on a shard. With next_due, the shard counts as
+        scanned and waits until then; without it, it is due again right away.
+        Returns False if the lease had already been lost.
+        """
+        if next_due is None:
+            cursor = db.execute(
+                "UPDATE scan_leases SET owner = NULL, lease_expires = 0 WHERE shard = ? AND owner = ?",
+                (shard, self.worker_id), path=self.path
+            )
+        else:
+            cursor = db.execute(
+                "UPDATE scan_leases SET owner = NULL, lease_expires = 0, next_due = ? WHERE shard = ? AND owner = ?",
+                (next_due, shard, self.worker_id), path=self.path
+            )
+        return cursor.rowcount == 1
+
+    def seconds_until_next(self, now=None):
+        """Seconds until a shard is due or a lease expires, whichever is sooner."""
+        now = time.time() if now is None else now
+        row = db.fetchone(
+            "SELECT MIN(MAX(next_due, CASE WHEN owner IS NULL THEN 0 ELSE lease_expires END)) FROM scan_leases",
+            path=self.path
+        )
+        return max(row[0] - now, 0) if row and row[0] is not None else None
+
+    def select(self, games, shard):
+        """The (id, game_name, app_id, price_threshold) rows that belong to a shard."""
+        return [game for game in games if shard_of(game[2], self.shard_count) == shard]
+
+class Heartbeat:
+    """Context manager that renews a shard lease from a background thread."""
+
+    def __init__(self, leases, shard, interval=HEARTBEAT_SECONDS):
+        self.leases = leases
+        self.shard = shard
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{shard}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.leases.heartbeat(self.shard):
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
@@ -0,0 +1,161 @@
+import json
+import logging
+import threading
+import time
+from types import MappingProxyType
+from urllib.parse import parse_qs, urlsplit
+
+# Define constants
+API_HOST = "127.0.0.1"  # Local only, like the metrics endpoint
+SORT_KEYS = {
+    "discount": lambda entry: (-entry["discount_percent"], entry["price"]),
+    "price": lambda entry: (entry["price"], -entry["discount_percent"]),
+    "name": lambda entry: entry["game_name"].lower()
+}
+RESPONSE_CACHE_SIZE = 64  # Encoded responses kept per snapshot version
+
+class _Version:
+    """One immutable generation of the snapshot, with its cached query responses."""
+
+    def __init__(self, entries, number, updated_at):
+        self.entries = MappingProxyType(entries)
+        self.number = number
+        self.updated_at = updated_at
+        self.responses = {}  # Query -> encoded JSON, filled by readers
+
+class PriceSnapshot:
+    """
+    Latest price of every watched game, kept in memory for local queries.
+    Updates build a new generation and swap it in with one assignment
+    (copy-on-write), so readers never lock and never see a half-applied
+    scan. Entries hold app_id, game_name, price (dollars), discount_percent,
+    threshold and updated_at.
+    """
+
+    def __init__(self):
+        self._write_lock = threading.Lock()
+        self._version = _Version({}, 0, None)
+
+    def update(self, entries, now=None):
+        """
+        Merge {app_id: entry} into a new generation. Each call copies the
+        whole map, so scans stage their entries and update once per cycle.
+        """
+        if not entries:
+            return
+        now = time.time() if now is None else now
+        with self._write_lock:
+            merged = dict(self._version.entries)
+            merged.update(entries)
+            self._version = _Version(merged, self._version.number + 1, now)
+
+    def retain(self, app_ids):
+        """Drop games that are no longer watched."""
+        keep = set(app_ids)
+        with self._write_lock:
+            current = self._version
+            if keep.issuperset(current.entries):
+                return
+            entries = {app_id: entry for app_id, entry in current.entries.items() if app_id in keep}
+            self._version = _Version(entries, current.number + 1, time.time())
+
+    def get(self, app_id):
+        """Return the entry of one app, or None."""
+        return self._version.entries.get(int(app_id))
+
+    def query(self, on_sale=False, below_threshold=False, sort="discount", limit=None):
+        """
+        Return matching entries, sorted by discount (largest first), price
+        or name. below_threshold keeps games priced at or under their
+        threshold. Raises ValueError for an unknown sort or a negative limit.
+        """
+        return _select(self._version.entries, on_sale, below_threshold, sort, limit)
+
+    def response(self, on_sale=False, below_threshold=False, sort="discount", limit=None):
+        """
+        The JSON body for a query, encoded once per snapshot generation so
+        repeated dashboard polls cost a dict lookup.
+        """
+        version = self._version
+        key = (on_sale, below_threshold, sort, limit)
+        body = version.responses.get(key)
+        if body is None:
+            games = _select(version.entries, on_sale, below_threshold, sort, limit)
+            body = json.dumps({"updated_at": version.updated_at, "count": len(games), "games": games}).encode()
+            if len(version.responses) < RESPONSE_CACHE_SIZE:
+                version.responses[key] = body
+        return body
+
+def _select(entries, on_sale, below_threshold, sort, limit):
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort {sort!r}, expected one of {', '.join(SORT_KEYS)}")
+    if limit is not None and limit < 0:
+        raise ValueError("limit must not be negative")
+    games = entries.values()
+    if on_sale:
+        games = [entry for entry in games if entry["discount_percent"] > 0]
+    if below_threshold:
+        games = [entry for entry in games if entry["threshold"] is not None and entry["price"] <= entry["threshold"]]
+    return sorted(games, key=SORT_KEYS[sort])[:limit]
+
+_snapshot = PriceSnapshot()
+
+def get_snapshot():
+    """Return the shared price snapshot."""
+    return _snapshot
+
+def _flag(query, name):
+    return query.get(name, ["0"])[-1].lower() in ("1", "true", "yes")
+
+def start_server(port, host=API_HOST, snapshot=None):
+    """
+    Serve the snapshot from a background thread:
+    GET /prices?on_sale=1&below_threshold=1&sort=discount|price|name&limit=N
+    and GET /prices/<app_id>. Returns the server; call shutdown() on it to stop.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    snapshot = snapshot or _snapshot
+
+    class SnapshotHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so pollers reuse their connection
+        wbufsize = 64 * 1024  # Send headers and body in one packet
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip("/").split("/")
+            if parts == ["prices"]:
+                query = parse_qs(url.query)
+                try:
+                    limit = int(query["limit"][-1]) if "limit" in query else None
+                    body = snapshot.response(_flag(query, "on_sale"), _flag(query, "below_threshold"),
+                                             query.get("sort", ["discount"])[-1], limit)
+                except ValueError as e:
+                    self._reply(400, json.dumps({"error": str(e)}).encode())
+                    return
+                self._reply(200, body)
+            elif len(parts) == 2 and parts[0] == "prices" and parts[1].isdigit():
+                entry = snapshot.get(parts[1])
+                if entry is None:
+                    self._reply(404, json.dumps({"error": f"App {parts[1]} is not in the snapshot"}).encode())
+                else:
+                    self._reply(200, json.dumps(entry).encode())
+            else:
+                self._reply(404, json.dumps({"error": "Not found"}).encode())
+
+    server = ThreadingHTTPServer((host, port), SnapshotHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="snapshot-server", daemon=True).start()
+    logging.info(f"event=snapshot_server_started address=http://{host}:{server.server_address[1]}/prices")
+    return server
@@ -0,0 +1,97 @@
+import logging
+import time
+import http_client
+import metrics
+
+# Define constants
+FEATURED_CATEGORIES_URL = "https://store.steampowered.com/api/featuredcategories"
+SPECIALS_TTL = 900  # Seconds before the specials listing is fetched again
+SWEEP_INTERVAL = 24 * 3600  # Games outside the listing are still fetched this often
+APP_ITEM_TYPE = 0  # Listing items can also be bundles and packages
+
+def parse_specials(data):
+    """
+    Return {app_id: item} for every discounted app in a featuredcategories
+    response (already decoded from JSON). Every category with an items list
+    is read, so the specials, top sellers and spotlight lists all count.
+    """
+    discounted = {}
+    for category in (data or {}).values():
+        if not isinstance(category, dict) or not isinstance(category.get("items"), list):
+            continue
+        for item in category["items"]:
+            if item.get("type", APP_ITEM_TYPE) == APP_ITEM_TYPE and item.get("discounted") and item.get("id"):
+                discounted[int(item["id"])] = item
+    return discounted
+
+def fetch_specials(country_code, language):
+    """Fetch and parse the store's featured categories. Returns None if the request fails."""
+    try:
+        with metrics.track("steam_request", endpoint="specials"):
+            response = http_client.get(FEATURED_CATEGORIES_URL, params={"cc": country_code, "l": language})
+            response.raise_for_status()
+            return parse_specials(response.json())
+    except Exception as e:
+        logging.error(f"Error fetching the specials listing: {e}")
+        return None
+
+class SpecialsPrefilter:
+    """
+    Picks which due games are worth a price request. A game is fetched when
+    it appears discounted in the store's specials listing, when it has an
+    active notification (so the end of its sale is noticed), or when it has
+    not been fetched for sweep_interval, which catches discounts the listing
+    leaves out and threshold drops without a discount. When the listing
+    cannot be fetched every game is kept.
+    """
+
+    def __init__(self, country_code, language, ttl=SPECIALS_TTL, sweep_interval=SWEEP_INTERVAL,
+                 fetch=fetch_specials):
+        self.country_code = country_code
+        self.language = language
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._fetch = fetch  # fetch(country_code, language) -> {app_id: item} or None
+        self._specials = None
+        self._fetched_at = None  # Last attempt
+        self._last_fetched = {}  # app_id -> time its price was last requested
+
+    def specials(self, now=None):
+        """
+        Return the cached {app_id: item} listing, refreshed once it is older
+        than ttl, or None if the last fetch failed.
+        """
+        now = time.time() if now is None else now
+        if self._fetched_at is None or now - self._fetched_at >= self.ttl:
+            # A failed fetch leaves no listing, so every game is kept until the next attempt
+            self._specials = self._fetch(self.country_code, self.language)
+            self._fetched_at = now
+            if self._specials is not None:
+                metrics.set_gauge("specials_listed_apps", len(self._specials))
+        return self._specials
+
+    def split(self, games, active_app_ids=(), now=None):
+        """
+        Split (id, game_name, app_id, price_threshold) rows into the games to
+        fetch and the games to skip this time. active_app_ids holds the apps
+        with an active notification.
+        """
+        now = time.time() if now is None else now
+        specials = self.specials(now)
+        if specials is None:
+            keep, skip = list(games), []
+        else:
+            active = {int(app_id) for app_id in active_app_ids}
+            keep, skip = [], []
+            for game in games:
+                app_id = game[2]
+                last_fetched = self._last_fetched.get(app_id)
+                if (app_id in specials or app_id in active or last_fetched is None
+                        or now - last_fetched >= self.sweep_interval):
+                    keep.append(game)
+                else:
+                    skip.append(game)
+        for game in keep:
+            self._last_fetched[game[2]] = now
+        metrics.inc("specials_skipped_games_total", len(skip))
+        return keep, skip
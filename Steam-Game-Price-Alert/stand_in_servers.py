@@ -0,0 +1,162 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class _StandInServer:
+    """Base for the local stand-ins: a threaded HTTP server on a free port."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, rate_limit_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _roll(self):
+        """Count a request and decide whether it fails: returns None, 'error' or 'rate_limit'."""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.rate_limit_rate:
+            return "rate_limit"
+        return None
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = 64 * 1024  # Send headers and body in one packet
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stand_in.handle(self, "GET")
+
+            def do_POST(self):
+                stand_in.handle(self, "POST")
+
+        return Handler
+
+class SteamStandIn(_StandInServer):
+    """
+    Stand-in for store.steampowered.com/api/appdetails serving a synthetic
+    catalog of app IDs 1..catalog_size with deterministic prices.
+    """
+
+    def __init__(self, catalog_size=1000, discount_rate=0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.catalog_size = catalog_size
+        self.discount_rate = discount_rate
+
+    @property
+    def appdetails_url(self):
+        return f"{self.base_url}/api/appdetails"
+
+    def price_overview(self, app_id):
+        rng = random.Random(app_id)
+        initial = rng.choice((499, 999, 1999, 2999, 3999, 5999))
+        discount = rng.choice((10, 25, 50, 75)) if rng.random() < self.discount_rate else 0
+        return {
+            "currency": "USD",
+            "initial": initial,
+            "final": initial * (100 - discount) // 100,
+            "discount_percent": discount
+        }
+
+    def app_data(self, app_id, price_only):
+        data = {"price_overview": self.price_overview(app_id)}
+        if not price_only:
+            data.update({
+                "name": f"Synthetic Game {app_id}",
+                "steam_appid": app_id,
+                "header_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{app_id}/header.jpg",
+                "short_description": "A game that only exists in benchmarks. " * 20
+            })
+        return data
+
+    def handle(self, handler, method):
+        if self.latency:
+            time.sleep(self.latency)
+        failure = self._roll()
+        if failure == "error":
+            return handler.reply(500, b"Internal Server Error")
+        if failure == "rate_limit":
+            return handler.reply(429, b"Too Many Requests", {"Retry-After": "1"})
+
+        query = parse_qs(urlparse(handler.path).query)
+        price_only = query.get("filters") == ["price_overview"]
+        result = {}
+        for app_id in query.get("appids", [""])[0].split(","):
+            if not app_id.isdigit():
+                continue
+            if 1 <= int(app_id) <= self.catalog_size:
+                result[app_id] = {"success": True, "data": self.app_data(int(app_id), price_only)}
+            else:
+                result[app_id] = {"success": False}
+        handler.reply(200, json.dumps(result).encode(), {"Content-Type": "application/json"})
+
+class DiscordStandIn(_StandInServer):
+    """Stand-in for a Discord webhook that records deliveries and can answer 429."""
+
+    def __init__(self, retry_after=0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.retry_after = retry_after
+        self.messages = 0
+        self.embeds = 0
+
+    @property
+    def webhook_url(self):
+        return f"{self.base_url}/api/webhooks/0/stand-in"
+
+    def handle(self, handler, method):
+        body = handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+        if self.latency:
+            time.sleep(self.latency)
+        failure = self._roll()
+        if failure == "error":
+            return handler.reply(500, b"Internal Server Error")
+        if failure == "rate_limit":
+            payload = json.dumps({"message": "You are being rate limited.", "retry_after": self.retry_after})
+            return handler.reply(429, payload.encode(), {
+                "Content-Type": "application/json",
+                "Retry-After": str(self.retry_after)
+            })
+
+        embeds = len(json.loads(body).get("embeds", []))
+        with self._lock:
+            self.messages += 1
+            self.embeds += embeds
+        handler.reply(204, headers={"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "1"})
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A fresh SQLite database for one test."""
+    yield str(tmp_path / "saved_games.db")
+    db.close_connections()
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    """Run scans against fresh databases, history and snapshot in tmp_path."""
+    import notification_state
+    import price_history
+    import scan_engine
+    import snapshot
+    from saved_games import initialize_database
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(notification_state, "_state", None)
+    monkeypatch.setattr(price_history, "_history", None)
+    monkeypatch.setattr(snapshot, "_snapshot", snapshot.PriceSnapshot())
+    initialize_database()
+    yield tmp_path
+    scan_engine.shutdown()  # Pool threads keep connections to this test's database
+    price_history.close_history()
+    db.close_connections()
@@ -0,0 +1,115 @@
+import pytest
+
+import db
+import outbox
+from notification_state import NotificationState
+from outbox import Outbox
+
+NOW = 1_000_000.0
+EMBED = {"title": "Game", "description": "On sale"}
+
+@pytest.fixture
+def box(db_path):
+    return Outbox(path=db_path)
+
+def add(box, key, now=NOW):
+    return box.add(key, "https://discord.test/webhook", "Bot", "", EMBED, now=now)
+
+def test_pending_key_is_queued_once(box):
+    assert add(box, "sale:1:9.99:50")
+    assert not add(box, "sale:1:9.99:50")
+    assert box.pending() == 1
+
+def test_sent_key_can_be_queued_again(box):
+    add(box, "sale:1:9.99:50")
+    rows = box.claim(10, now=NOW)
+    box.mark_sent([row["id"] for row in rows], rows[0]["claim"], now=NOW)
+    assert box.pending() == 0
+    assert add(box, "sale:1:9.99:50", now=NOW + 10)
+    assert box.pending() == 1
+
+def test_claimed_rows_are_hidden_until_the_claim_expires(box):
+    add(box, "a")
+    add(box, "b")
+    rows = box.claim(10, now=NOW)
+    assert [row["embed"] for row in rows] == [EMBED, EMBED]
+    assert box.claim(10, now=NOW + 1) == []
+    assert len(box.claim(10, now=NOW + outbox.CLAIM_SECONDS)) == 2
+
+def test_expired_claim_cannot_report_rows_taken_over(box):
+    add(box, "a")
+    first = box.claim(10, now=NOW)[0]
+    second = box.claim(10, now=NOW + outbox.CLAIM_SECONDS)[0]
+    assert box.renew([first["id"]], first["claim"], now=NOW + outbox.CLAIM_SECONDS) == []
+    assert box.mark_sent([first["id"]], first["claim"], now=NOW + outbox.CLAIM_SECONDS) == 0
+    assert box.mark_failed([first["id"]], first["claim"], "boom", now=NOW + outbox.CLAIM_SECONDS) == 0
+    assert box.pending() == 1
+    assert box.mark_sent([second["id"]], second["claim"], now=NOW + outbox.CLAIM_SECONDS) == 1
+    assert box.pending() == 0
+
+def test_renew_extends_the_claim(box):
+    add(box, "a")
+    row = box.claim(10, now=NOW)[0]
+    assert box.renew([row["id"]], row["claim"], now=NOW + 100) == [row["id"]]
+    assert box.claim(10, now=NOW + outbox.CLAIM_SECONDS) == []
+    assert len(box.claim(10, now=NOW + 100 + outbox.CLAIM_SECONDS)) == 1
+
+def test_claim_column_is_added_to_an_old_table(db_path):
+    db.execute(
+        "CREATE TABLE notification_outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE, "
+        "webhook_url TEXT NOT NULL, bot_name TEXT, bot_avatar TEXT, embed TEXT NOT NULL, status TEXT NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, created_at REAL NOT NULL, "
+        "sent_at REAL, last_error TEXT)", path=db_path
+    )
+    box = Outbox(path=db_path)
+    add(box, "a")
+    row = box.claim(10, now=NOW)[0]
+    assert box.mark_sent([row["id"]], row["claim"], now=NOW) == 1
+
+def test_failed_rows_back_off_then_die(box):
+    add(box, "a")
+    now = NOW
+    for attempt in range(1, outbox.MAX_ATTEMPTS + 1):
+        rows = box.claim(10, now=now)
+        assert len(rows) == 1
+        dead = box.mark_failed([rows[0]["id"]], rows[0]["claim"], "boom", now=now)
+        delay = min(outbox.RETRY_BASE * 2 ** (attempt - 1), outbox.MAX_RETRY_DELAY)
+        assert box.claim(10, now=now + delay - 1) == []
+        now += delay
+        assert dead == (attempt == outbox.MAX_ATTEMPTS)
+    assert box.pending() == 0
+    status, attempts, error = db.fetchone(
+        "SELECT status, attempts, last_error FROM notification_outbox", path=box.path
+    )
+    assert (status, attempts, error) == (outbox.DEAD, outbox.MAX_ATTEMPTS, "boom")
+
+def test_pending_due_only(box):
+    add(box, "a")
+    row = box.claim(10, now=NOW)[0]
+    box.mark_failed([row["id"]], row["claim"], "boom", now=NOW)
+    assert box.pending(now=NOW) == 1
+    assert box.pending(due_only=True, now=NOW) == 0
+
+def test_prune_keeps_pending_rows(box):
+    add(box, "a")
+    add(box, "b")
+    row = box.claim(1, now=NOW)[0]
+    box.mark_sent([row["id"]], row["claim"], now=NOW)
+    box.prune(now=NOW + outbox.SENT_RETENTION + 1)
+    assert db.fetchone("SELECT COUNT(*) FROM notification_outbox", path=box.path)[0] == 1
+    assert box.pending() == 1
+
+def test_rolled_back_alert_leaves_no_trace(box, db_path):
+    state = NotificationState(path=db_path)
+    with pytest.raises(RuntimeError):
+        with db.transaction(db_path):
+            add(box, "sale:1:9.99:50")
+            state.mark("sale", 1, "Game", 9.99, 50)
+            raise RuntimeError("webhook rejected")
+    assert box.pending() == 0
+    assert not state.is_notified("sale", 1)
+    with db.transaction(db_path):
+        add(box, "sale:1:9.99:50")
+        state.mark("sale", 1, "Game", 9.99, 50)
+    assert box.pending() == 1
+    assert state.is_notified("sale", 1)
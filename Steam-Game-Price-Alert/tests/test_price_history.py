@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import price_history
+from price_history import HEADER, RECORD, PriceHistory
+
+def price(final, discount=0):
+    return {"final": final, "discount_percent": discount}
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "price_history.bin")
+
+def test_pack_price_round_trip_and_clamping():
+    assert price_history.unpack_price(price_history.pack_price(1999, 75)) == (1999, 75)
+    assert price_history.unpack_price(price_history.pack_price(10 ** 9, 300)) == (price_history.MAX_FINAL, 255)
+
+def test_only_changes_and_heartbeats_are_recorded(path):
+    history = PriceHistory(path, heartbeat=100)
+    assert history.record({1: price(1000), 2: None}, timestamp=1000) == 1
+    assert history.record({1: price(1000)}, timestamp=1050) == 0
+    assert history.record({1: price(500, 50)}, timestamp=1060) == 1
+    assert history.record({1: price(500, 50)}, timestamp=1160) == 1
+    assert history.samples(1) == [(1000, 1000, 0), (1060, 500, 50), (1160, 500, 50)]
+    assert history.samples(1, start=1050, end=1100) == [(1060, 500, 50)]
+    assert history.latest(1) == (1160, 500, 50)
+    assert history.latest(2) is None
+    history.close()
+
+def test_index_is_checkpointed_and_written_on_close(path):
+    history = PriceHistory(path, checkpoint=3600)
+    history.record({app_id: price(100) for app_id in range(10)}, timestamp=1000)
+    assert not os.path.exists(f"{path}.idx")
+    history.close()
+    assert os.path.exists(f"{path}.idx")
+    reopened = PriceHistory(path)
+    assert sorted(reopened.app_ids()) == list(range(10))
+    reopened.close()
+
+def test_reopening_catches_up_on_records_the_index_missed(path):
+    history = PriceHistory(path, checkpoint=0)
+    history.record({1: price(100)}, timestamp=1000)
+    history.checkpoint = 3600
+    history.record({1: price(90), 2: price(50)}, timestamp=2000)
+    del history  # Crash: the index still covers only the first record
+    reopened = PriceHistory(path)
+    assert reopened.samples(1) == [(1000, 100, 0), (2000, 90, 0)]
+    assert reopened.latest(2) == (2000, 50, 0)
+    reopened.close()
+
+def test_partial_record_is_dropped(path):
+    history = PriceHistory(path)
+    history.record({1: price(100)}, timestamp=1000)
+    history.close()
+    with open(path, "ab") as file:
+        file.write(b"\x01\x02\x03")
+    reopened = PriceHistory(path)
+    assert reopened.count == 1
+    assert os.path.getsize(path) == HEADER.size + RECORD.size
+    reopened.close()
+
+def test_rejects_foreign_files(path):
+    with open(path, "wb") as file:
+        file.write(b"NOPE" + bytes(HEADER.size))
+    with pytest.raises(ValueError):
+        PriceHistory(path)
+
+def test_writers_sharing_a_file_see_each_others_records(path):
+    first = PriceHistory(path)
+    second = PriceHistory(path)
+    first.record({1: price(100)}, timestamp=1000)
+    second.record({1: price(80), 2: price(50)}, timestamp=2000)
+    first.record({1: price(60)}, timestamp=3000)
+    for history in (first, second):
+        assert history.samples(1) == [(1000, 100, 0), (2000, 80, 0), (3000, 60, 0)]
+        assert history.latest(2) == (2000, 50, 0)
+    assert first.count == second.count == 4
+    first.close()
+    second.close()
+
+def test_records_buffer_exposes_every_record(path):
+    history = PriceHistory(path)
+    history.record({1: price(100), 2: price(200)}, timestamp=1000)
+    buffer = history.records_buffer()
+    assert len(buffer) == 2 * RECORD.size
+    assert RECORD.unpack_from(buffer, RECORD.size)[1] == 2
+    buffer.release()
+    history.close()
@@ -0,0 +1,72 @@
+import pytest
+
+import price_history
+import rules
+
+def game(app_id, threshold=None):
+    return (app_id, f"Game {app_id}", app_id, threshold)
+
+def price(final, discount=0):
+    return {"final": final, "discount_percent": discount}
+
+def test_compile_rule_groups_and_before_or():
+    rule = rules.compile_rule("price <= 10 and discount >= 50 or low <= 5")
+    assert rule.matches(9.99, 50)
+    assert not rule.matches(9.99, 40)
+    assert rule.matches(30.0, 0, above_low=5)
+    assert rule.needs_history
+
+def test_compile_rule_shorthands():
+    assert rules.compile_rule("sale").matches(5.0, 10)
+    assert rules.compile_rule("threshold").matches(5.0, 0, threshold=5.0)
+    assert not rules.compile_rule("threshold").matches(5.0, 0)
+
+@pytest.mark.parametrize("spec", ["price", "discount <= threshold", "price <= ten", "price <= 5 xor sale"])
+def test_compile_rule_rejects_invalid_rules(spec):
+    with pytest.raises(ValueError):
+        rules.compile_rule(spec)
+
+def test_prepare_falls_back_on_invalid_custom_rule():
+    fallback = rules.compile_rule(rules.SALE_RULE)
+    compiled, lows = rules.prepare([game(1), game(2)], {2: "discount >= 50"}, fallback)
+    assert compiled[1] is fallback
+    assert compiled[2].spec == "discount >= 50"
+    assert lows == {}
+
+def test_evaluate_prices_skips_games_without_price():
+    fallback = rules.compile_rule(rules.THRESHOLD_RULE)
+    games = [game(1, 10.0), game(2, 10.0)]
+    compiled, lows = rules.prepare(games, {}, fallback)
+    outcome = rules.evaluate_prices(games, {1: price(999), 2: None}, compiled, lows)
+    assert outcome == {1: (fallback, True)}
+
+def test_low_is_measured_against_history():
+    rule = rules.compile_rule("low <= 5")
+    games = [game(1), game(2)]
+    lows = {1: {"all_time_low": 1000}, 2: {"all_time_low": 1000}}
+    outcome = rules.evaluate_prices(games, {1: price(1040), 2: price(1200)}, {1: rule, 2: rule}, lows)
+    assert outcome[1][1]
+    assert not outcome[2][1]
+
+def test_game_without_history_counts_as_at_its_low():
+    rule = rules.compile_rule("sale and low <= 5")
+    outcome = rules.evaluate_prices([game(1)], {1: price(500, 50)}, {1: rule}, {})
+    assert outcome[1][1]
+
+def test_low_never_matches_without_numpy():
+    rule = rules.compile_rule("low <= 5")
+    outcome = rules.evaluate_prices([game(1)], {1: price(500)}, {1: rule}, None)
+    assert not outcome[1][1]
+
+def test_first_scan_matches_near_low_rule(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    history = price_history.PriceHistory(str(tmp_path / "price_history.bin"))
+    monkeypatch.setattr(price_history, "_history", history)
+    history.record({1: price(2000)}, timestamp=1000)
+    rule = rules.compile_rule("low <= 5")
+    games = [game(1), game(2)]
+    compiled, lows = rules.prepare(games, {}, rule)
+    outcome = rules.evaluate_prices(games, {1: price(2000), 2: price(700)}, compiled, lows)
+    assert outcome[1][1]  # At its recorded low
+    assert outcome[2][1]  # No history yet
+    history.close()
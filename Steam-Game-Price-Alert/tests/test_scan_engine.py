@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+import metrics
+import scan_engine
+import scanner
+
+BATCHES = 20
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Fake Steam fetches and restore the pipeline settings afterwards."""
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(app_ids, country_code, language):
+        with lock:
+            fetched.append(app_ids)
+        return {app_id: {"final": 999} for app_id in app_ids}
+
+    monkeypatch.setattr(scanner, "fetch_price_batch", fetch)
+    monkeypatch.setattr(scan_engine, "_pipeline_settings", dict(scan_engine._pipeline_settings))
+    yield fetched
+    scan_engine.shutdown()
+
+def make_games(count):
+    return [(f"Game {app_id}", None, app_id) for app_id in range(1, count + 1)]
+
+def max_depth(queue):
+    return metrics.get_registry().gauges[("pipeline_queue_max_depth", (("queue", queue),))]
+
+def test_every_batch_is_evaluated_and_notified_once(pipeline):
+    games = make_games(BATCHES * scanner.PRICE_BATCH_SIZE)
+    evaluated, notified = [], []
+
+    def evaluate_batch(batch, prices):
+        time.sleep(0.002)  # Slower than the fetchers, so the evaluate queue fills
+        evaluated.extend(game[2] for game in batch)
+        return [game[2] for game in batch if game[2] % 50 == 0]
+
+    def notify(app_id):
+        time.sleep(0.001)
+        notified.append(app_id)
+
+    scan_engine.configure(fetch_concurrency=4, evaluate_queue_size=2, notify_queue_size=3)
+    scan_engine.run_pipeline(games, "US", "en", evaluate_batch, notify)
+    assert sorted(app_id for batch in pipeline for app_id in batch) == [game[2] for game in games]
+    assert sorted(evaluated) == [game[2] for game in games]
+    assert sorted(notified) == list(range(50, len(games) + 1, 50))
+    assert 1 <= max_depth("evaluate") <= 2
+    assert 1 <= max_depth("notify") <= 3
+
+def test_slow_notifier_does_not_hold_up_fetches(pipeline):
+    games = make_games(BATCHES * scanner.PRICE_BATCH_SIZE)
+    all_fetched = threading.Event()
+    waited = []
+
+    def evaluate_batch(batch, prices):
+        if len(pipeline) == BATCHES:
+            all_fetched.set()
+        return [batch[0][2]]
+
+    def notify(app_id):
+        # A stuck webhook: only returns once every batch has been fetched
+        waited.append(all_fetched.wait(timeout=5))
+
+    scan_engine.configure(notify_queue_size=BATCHES)
+    scan_engine.run_pipeline(games, "US", "en", evaluate_batch, notify)
+    assert len(waited) == BATCHES
+    assert all(waited)
@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+
+import pytest
+
+import scanner
+import snapshot
+from notification_state import get_state, SALE
+from saved_games import add_games, get_watchlist
+from scheduler import ScanScheduler
+
+GAMES = 200
+ON_SALE = {10, 20, 30, 40}
+
+def fake_prices(app_ids, country_code, language):
+    return {
+        app_id: {"final": 999, "discount_percent": 50 if app_id in ON_SALE else 0}
+        for app_id in app_ids
+    }
+
+@pytest.fixture
+def watchlist(app_dir, monkeypatch):
+    add_games([(f"Game {i}", f"https://store.steampowered.com/app/{i}/", i, None) for i in range(1, GAMES + 1)])
+    monkeypatch.setattr(scanner, "fetch_price_batch", fake_prices)
+    monkeypatch.setattr(scanner, "get_game_metadata_cached",
+                        lambda app_id, game_name, country_code, language: (game_name, "image"))
+    return get_watchlist()
+
+def scan(games):
+    return scanner.run_scan_cycle(games, scanner.MODE_SALE, "US", "en", "https://discord.test/webhook", "Bot", "")
+
+def test_failing_notification_does_not_cancel_the_cycle(watchlist, monkeypatch):
+    queued = []
+    lock = threading.Lock()
+
+    def queue(**kwargs):
+        with lock:
+            if not queued:
+                queued.append(None)
+                raise sqlite3.OperationalError("database is locked")
+            queued.append(kwargs["app_id"])
+
+    monkeypatch.setattr(scanner, "queue_discord_notification", queue)
+    results, _ = scan(watchlist)
+    statuses = {result["app_id"]: result["status"] for result in results}
+    failed = [app_id for app_id, status in statuses.items() if status == "failed"]
+    assert len(failed) == 1
+    assert sorted(queued[1:] + failed) == sorted(ON_SALE)
+    assert all(statuses[app_id] == "notified" for app_id in ON_SALE - set(failed))
+    assert not get_state().is_notified(SALE, failed[0])  # Alerted again on the next scan
+    assert len(snapshot.get_snapshot().query()) == GAMES
+
+    scheduler = ScanScheduler(default_interval=3600)
+    scheduler.sync([game[2] for game in watchlist], {})
+    scheduler.pop_due(now=float("inf"))
+    for result in results:
+        scheduler.record_result(result, now=0)
+    assert scheduler.seconds_until_next(now=0) < 3600  # The failed game is retried with backoff
+
+def test_failing_batch_marks_only_its_games(watchlist, monkeypatch):
+    def broken_prices(app_ids, country_code, language):
+        prices = fake_prices(app_ids, country_code, language)
+        if 1 in app_ids:
+            prices[1] = {"final": "not a price"}
+        return prices
+
+    monkeypatch.setattr(scanner, "fetch_price_batch", broken_prices)
+    monkeypatch.setattr(scanner, "queue_discord_notification", lambda **kwargs: None)
+    results, _ = scan(watchlist)
+    failed = {result["app_id"] for result in results if result["status"] == "failed"}
+    assert failed == set(range(1, scanner.PRICE_BATCH_SIZE + 1))
+    assert {result["app_id"] for result in results if result["status"] == "notified"} == ON_SALE - failed
+
+def test_scan_loop_survives_a_failing_cycle(watchlist, monkeypatch):
+    stop = threading.Event()
+    cycles = []
+
+    def broken_cycle(*args, **kwargs):
+        cycles.append(args[0])
+        stop.set()
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(scanner, "run_scan_cycle", broken_cycle)
+    scanner.run_scan_loop(get_watchlist, scanner.MODE_SALE, "US", "en", "", "Bot", "", stop_event=stop)
+    assert len(cycles) == 1
+
+@pytest.mark.parametrize("ratio, percent", [(0.05, "5"), (0.0125, "1.25"), (1e-07, "0.00001")])
+def test_default_rule_writes_near_low_in_fixed_point(ratio, percent):
+    assert scanner.default_rule(scanner.MODE_SALE, ratio).spec.endswith(f"low <= {percent}")
+
+@pytest.mark.parametrize("ratio", [0, -0.05, float("nan")])
+def test_default_rule_rejects_non_positive_near_low(ratio):
+    with pytest.raises(ValueError):
+        scanner.default_rule(scanner.MODE_SALE, ratio)
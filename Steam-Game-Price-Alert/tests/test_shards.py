@@ -0,0 +1,69 @@
+import pytest
+
+import db
+import shards
+from shards import ShardLeases
+
+NOW = 1_000_000.0
+
+def test_select_keeps_the_games_of_one_shard(db_path):
+    leases = ShardLeases("w1", shard_count=16, path=db_path)
+    games = [(1, "a", 16, None), (2, "b", 17, None), (3, "c", 32, None)]
+    assert shards.shard_of(33, 16) == 1
+    assert [game[2] for game in leases.select(games, 0)] == [16, 32]
+
+def test_each_shard_is_claimed_by_one_worker(db_path):
+    first = ShardLeases("w1", shard_count=2, path=db_path)
+    second = ShardLeases("w2", shard_count=2, path=db_path)
+    assert {first.claim(now=NOW), second.claim(now=NOW)} == {0, 1}
+    assert ShardLeases("w3", shard_count=2, path=db_path).claim(now=NOW) is None
+
+def test_released_shard_waits_until_next_due(db_path):
+    leases = ShardLeases("w1", shard_count=1, path=db_path)
+    shard = leases.claim(now=NOW)
+    assert leases.release(shard, next_due=NOW + 3600)
+    assert leases.claim(now=NOW + 10) is None
+    assert leases.seconds_until_next(now=NOW + 10) == pytest.approx(3590)
+    assert leases.claim(now=NOW + 3600) == shard
+
+def test_expired_lease_is_taken_over(db_path):
+    first = ShardLeases("w1", shard_count=1, lease_seconds=60, path=db_path)
+    second = ShardLeases("w2", shard_count=1, lease_seconds=60, path=db_path)
+    shard = first.claim(now=NOW)
+    assert second.claim(now=NOW + 30) is None
+    assert second.claim(now=NOW + 61) == shard
+    assert not first.holds(shard)
+    assert second.holds(shard)
+    assert not first.heartbeat(shard, now=NOW + 62)
+    assert not first.release(shard, next_due=NOW + 3600)
+    assert second.heartbeat(shard, now=NOW + 62)
+
+def test_failed_release_leaves_the_shard_due(db_path):
+    leases = ShardLeases("w1", shard_count=1, path=db_path)
+    shard = leases.claim(now=NOW)
+    leases.release(shard)
+    assert leases.claim(now=NOW) == shard
+
+def test_shard_count_cannot_change_while_leases_are_live(db_path):
+    leases = ShardLeases("w1", shard_count=4, path=db_path)
+    leases.claim()
+    with pytest.raises(ValueError):
+        ShardLeases("w2", shard_count=8, path=db_path)
+
+def test_shard_count_changes_once_leases_are_released(db_path):
+    leases = ShardLeases("w1", shard_count=4, path=db_path)
+    leases.release(leases.claim())
+    ShardLeases("w2", shard_count=8, path=db_path)
+    assert db.fetchone("SELECT COUNT(*) FROM scan_leases", path=db_path)[0] == 8
+
+def test_heartbeat_flags_a_lost_lease(db_path):
+    first = ShardLeases("w1", shard_count=1, lease_seconds=60, path=db_path)
+    second = ShardLeases("w2", shard_count=1, lease_seconds=60, path=db_path)
+    shard = first.claim(now=NOW)
+    second.claim(now=NOW + 61)
+    with shards.Heartbeat(first, shard, interval=0.01) as heartbeat:
+        for _ in range(200):
+            if heartbeat.lost:
+                break
+            heartbeat._stop.wait(0.01)
+    assert heartbeat.lost
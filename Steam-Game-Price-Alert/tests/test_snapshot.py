@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from snapshot import PriceSnapshot
+
+def entry(app_id, price, discount=0, threshold=None, name=None):
+    return {
+        "app_id": app_id,
+        "game_name": name or f"Game {app_id}",
+        "price": price,
+        "discount_percent": discount,
+        "threshold": threshold,
+        "updated_at": 1000
+    }
+
+@pytest.fixture
+def snapshot():
+    snapshot = PriceSnapshot()
+    snapshot.update({
+        1: entry(1, 9.99, 50, threshold=10.0, name="beta"),
+        2: entry(2, 19.99, 0, threshold=15.0, name="Alpha"),
+        3: entry(3, 4.99, 75, name="gamma")
+    }, now=1000)
+    return snapshot
+
+def test_update_merges_into_a_new_generation(snapshot):
+    before = snapshot._version
+    snapshot.update({2: entry(2, 14.99, 25, threshold=15.0)}, now=2000)
+    assert snapshot.get(2)["price"] == 14.99
+    assert snapshot.get("1")["price"] == 9.99
+    assert snapshot._version.number == before.number + 1
+    assert before.entries[2]["price"] == 19.99  # Readers of the old generation are unaffected
+
+def test_empty_update_keeps_the_generation(snapshot):
+    before = snapshot._version
+    snapshot.update({})
+    assert snapshot._version is before
+
+def test_query_filters_and_sorts(snapshot):
+    assert [game["app_id"] for game in snapshot.query()] == [3, 1, 2]
+    assert [game["app_id"] for game in snapshot.query(sort="price")] == [3, 1, 2]
+    assert [game["app_id"] for game in snapshot.query(sort="name")] == [2, 1, 3]
+    assert [game["app_id"] for game in snapshot.query(on_sale=True, limit=1)] == [3]
+    assert [game["app_id"] for game in snapshot.query(below_threshold=True)] == [1]
+
+@pytest.mark.parametrize("kwargs", [{"sort": "rating"}, {"limit": -1}])
+def test_query_rejects_bad_arguments(snapshot, kwargs):
+    with pytest.raises(ValueError):
+        snapshot.query(**kwargs)
+
+def test_response_is_cached_per_generation(snapshot):
+    body = snapshot.response(on_sale=True)
+    assert snapshot.response(on_sale=True) is body
+    assert json.loads(body)["count"] == 2
+    snapshot.update({2: entry(2, 9.99, 50)}, now=2000)
+    body = snapshot.response(on_sale=True)
+    assert json.loads(body) == {"updated_at": 2000, "count": 3, "games": snapshot.query(on_sale=True)}
+
+def test_retain_drops_unwatched_games(snapshot):
+    snapshot.retain([1, 3])
+    assert snapshot.get(2) is None
+    assert len(snapshot.query()) == 2
+    before = snapshot._version
+    snapshot.retain([1, 3, 4])
+    assert snapshot._version is before
@@ -1,21 +1,51 @@
-import sqlite3
 import os
-from pyfiglet import Figlet
+import sys
+from contextlib import contextmanager, redirect_stdout
+from functools import lru_cache
+from io import StringIO
+import db
+
+# ANSI escape codes
+CLEAR_SCREEN = "\033[2J\033[H"
+HEADER_COLOR = "\033[1;34m"
+RESET_COLOR = "\033[0m"
+
+if os.name == 'nt':
+    os.system('')  # Enables ANSI escape code handling in the Windows console
 
 def get_all_games():
     """Retrieve all games from the database."""
-    conn = sqlite3.connect("saved_games.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, game_name FROM games")
-    games = cursor.fetchall()
-    conn.close()
-    return games
+    return db.fetchall("SELECT id, game_name FROM games")
 
 def clear_screen():
     """Clears the screen for better readability."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.flush()
+
+@contextmanager
+def screen_frame():
+    """
+    Buffers everything printed inside the block and writes it to the
+    terminal in one go after clearing the screen, so redraws don't flicker.
+    Don't call input() inside the block; its prompt would be buffered too.
+    """
+    buffer = StringIO()
+    with redirect_stdout(buffer):
+        yield
+    sys.stdout.write(CLEAR_SCREEN + buffer.getvalue())
+    sys.stdout.flush()
+
+@lru_cache(maxsize=None)
+def get_figlet(font):
+    """Loads a figlet font once; pyfiglet is only imported on first use."""
+    from pyfiglet import Figlet
+    return Figlet(font=font)
+
+@lru_cache(maxsize=64)
+def render_banner(title, font='slant'):
+    """Renders a title as colored ASCII art, remembering each title."""
+    return HEADER_COLOR + get_figlet(font).renderText(title) + RESET_COLOR
 
 def print_header(title):
     """Prints a header with a cool design using ASCII art."""
-    f = Figlet(font='slant')
-    print("\033[1;34m" + f.renderText(title) + "\033[0m")
\ No newline at end of file
+    print(render_banner(title))